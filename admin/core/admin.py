@@ -32,9 +32,25 @@ class ChatAdmin(admin.ModelAdmin):
         "processed_messages",
         "spam_detected",
     )
+    list_select_related = ("counters",)
     search_fields = ("title", "platform_chat_id")
     list_filter = ("type", "is_active", "enable_ai_check")
 
+    @staticmethod
+    def _counter(obj: models.Chat, field: str) -> int:
+        try:
+            return getattr(obj.counters, field)
+        except models.ChatCounter.DoesNotExist:
+            return 0
+
+    @admin.display(ordering="counters__processed_messages")
+    def processed_messages(self, obj: models.Chat) -> int:
+        return self._counter(obj, "processed_messages")
+
+    @admin.display(ordering="counters__spam_detected")
+    def spam_detected(self, obj: models.Chat) -> int:
+        return self._counter(obj, "spam_detected")
+
 
 @admin.register(models.Prompt)
 class PromptAdmin(admin.ModelAdmin):
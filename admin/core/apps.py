@@ -8,5 +8,7 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         from .db_triggers import ensure_updated_at_triggers
+        from .signals import connect
 
         post_migrate.connect(ensure_updated_at_triggers, sender=self)
+        connect()
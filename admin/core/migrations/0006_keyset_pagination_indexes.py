@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_remove_chat_custom_prompt_threshold_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chat',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='idx_chats_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='prompt',
+            index=models.Index(fields=['created_at', 'id'], name='idx_prompts_created'),
+        ),
+        migrations.AddIndex(
+            model_name='customprompt',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='idx_cprompts_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='userstate',
+            index=models.Index(fields=['chat', 'updated_at', 'id'], name='idx_user_states_chat_updated'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQL = """
+CREATE OR REPLACE FUNCTION user_states_member_counts()
+RETURNS trigger AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE chat_member_counts
+       SET trusted_count   = trusted_count   - (CASE WHEN OLD.trusted THEN 1 ELSE 0 END),
+           untrusted_count = untrusted_count - (CASE WHEN OLD.trusted THEN 0 ELSE 1 END)
+     WHERE chat_id = OLD.chat_id;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO chat_member_counts (chat_id, trusted_count, untrusted_count)
+    VALUES (
+      NEW.chat_id,
+      CASE WHEN NEW.trusted THEN 1 ELSE 0 END,
+      CASE WHEN NEW.trusted THEN 0 ELSE 1 END
+    )
+    ON CONFLICT (chat_id) DO UPDATE
+       SET trusted_count   = chat_member_counts.trusted_count   + EXCLUDED.trusted_count,
+           untrusted_count = chat_member_counts.untrusted_count + EXCLUDED.untrusted_count;
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_user_states_member_counts_ins_del ON user_states;
+CREATE TRIGGER trg_user_states_member_counts_ins_del
+AFTER INSERT OR DELETE ON user_states
+FOR EACH ROW
+EXECUTE FUNCTION user_states_member_counts();
+
+DROP TRIGGER IF EXISTS trg_user_states_member_counts_upd ON user_states;
+CREATE TRIGGER trg_user_states_member_counts_upd
+AFTER UPDATE OF trusted, chat_id ON user_states
+FOR EACH ROW
+WHEN (OLD.trusted IS DISTINCT FROM NEW.trusted OR OLD.chat_id IS DISTINCT FROM NEW.chat_id)
+EXECUTE FUNCTION user_states_member_counts();
+
+-- Backfill; block writers so the snapshot and the triggers agree
+LOCK TABLE user_states IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO chat_member_counts (chat_id, trusted_count, untrusted_count)
+SELECT chat_id,
+       count(*) FILTER (WHERE trusted),
+       count(*) FILTER (WHERE NOT trusted)
+  FROM user_states
+ GROUP BY chat_id
+ON CONFLICT (chat_id) DO UPDATE
+   SET trusted_count   = EXCLUDED.trusted_count,
+       untrusted_count = EXCLUDED.untrusted_count;
+"""
+
+REVERSE_SQL = """
+DROP TRIGGER IF EXISTS trg_user_states_member_counts_ins_del ON user_states;
+DROP TRIGGER IF EXISTS trg_user_states_member_counts_upd     ON user_states;
+DROP FUNCTION IF EXISTS user_states_member_counts();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatMemberCount',
+            fields=[
+                ('chat', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='member_count', serialize=False, to='core.chat')),
+                ('trusted_count', models.BigIntegerField(default=0)),
+                ('untrusted_count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'chat_member_counts',
+            },
+        ),
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
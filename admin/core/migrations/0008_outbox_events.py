@@ -0,0 +1,39 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+SQL = """
+ALTER TABLE outbox_events ALTER COLUMN created_at SET DEFAULT now();
+ALTER TABLE outbox_events ALTER COLUMN payload    SET DEFAULT '{}'::jsonb;
+"""
+
+REVERSE_SQL = """
+ALTER TABLE outbox_events ALTER COLUMN created_at DROP DEFAULT;
+ALTER TABLE outbox_events ALTER COLUMN payload    DROP DEFAULT;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_chat_member_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('aggregate_type', models.CharField(max_length=32)),
+                ('aggregate_id', models.UUIDField()),
+                ('chat_id', models.UUIDField(blank=True, null=True)),
+                ('event_type', models.CharField(max_length=64)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+            ],
+            options={
+                'db_table': 'outbox_events',
+            },
+        ),
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
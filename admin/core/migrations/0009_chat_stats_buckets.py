@@ -0,0 +1,76 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQL = """
+ALTER TABLE chat_stats_buckets ALTER COLUMN processed_messages SET DEFAULT 0;
+ALTER TABLE chat_stats_buckets ALTER COLUMN spam_detected      SET DEFAULT 0;
+ALTER TABLE chat_stats_buckets ALTER COLUMN messages_deleted   SET DEFAULT 0;
+
+-- Every increment of the lifetime counters on chats lands in the current
+-- minute bucket, whoever the writer is (bot, admin, backend).
+CREATE OR REPLACE FUNCTION chats_stats_buckets()
+RETURNS trigger AS $$
+BEGIN
+  INSERT INTO chat_stats_buckets (
+    chat_id, granularity, bucket_start,
+    processed_messages, spam_detected, messages_deleted
+  )
+  VALUES (
+    NEW.id, 'minute', date_trunc('minute', now()),
+    GREATEST(NEW.processed_messages - OLD.processed_messages, 0),
+    GREATEST(NEW.spam_detected      - OLD.spam_detected,      0),
+    GREATEST(NEW.messages_deleted   - OLD.messages_deleted,   0)
+  )
+  ON CONFLICT ON CONSTRAINT uk_chat_stats_buckets_chat_gran_start DO UPDATE
+     SET processed_messages = chat_stats_buckets.processed_messages + EXCLUDED.processed_messages,
+         spam_detected      = chat_stats_buckets.spam_detected      + EXCLUDED.spam_detected,
+         messages_deleted   = chat_stats_buckets.messages_deleted   + EXCLUDED.messages_deleted;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_chats_stats_buckets ON chats;
+CREATE TRIGGER trg_chats_stats_buckets
+AFTER UPDATE OF processed_messages, spam_detected, messages_deleted ON chats
+FOR EACH ROW
+WHEN (
+  NEW.processed_messages > OLD.processed_messages
+  OR NEW.spam_detected > OLD.spam_detected
+  OR NEW.messages_deleted > OLD.messages_deleted
+)
+EXECUTE FUNCTION chats_stats_buckets();
+"""
+
+REVERSE_SQL = """
+DROP TRIGGER IF EXISTS trg_chats_stats_buckets ON chats;
+DROP FUNCTION IF EXISTS chats_stats_buckets();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_outbox_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatStatsBucket',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('granularity', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=8)),
+                ('bucket_start', models.DateTimeField()),
+                ('processed_messages', models.BigIntegerField(default=0)),
+                ('spam_detected', models.BigIntegerField(default=0)),
+                ('messages_deleted', models.BigIntegerField(default=0)),
+                ('chat', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stats_buckets', to='core.chat')),
+            ],
+            options={
+                'db_table': 'chat_stats_buckets',
+                'constraints': [models.UniqueConstraint(fields=('chat', 'granularity', 'bucket_start'), name='uk_chat_stats_buckets_chat_gran_start')],
+            },
+        ),
+        migrations.RunSQL(SQL, REVERSE_SQL),
+    ]
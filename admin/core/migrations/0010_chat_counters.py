@@ -0,0 +1,159 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+SQL = """
+-- Counter rows are rewritten on every message: leave room on the page so
+-- the updates stay HOT (no index on the counter columns).
+ALTER TABLE chat_counters SET (fillfactor = 50);
+
+ALTER TABLE chat_counters ALTER COLUMN processed_messages SET DEFAULT 0;
+ALTER TABLE chat_counters ALTER COLUMN spam_detected      SET DEFAULT 0;
+ALTER TABLE chat_counters ALTER COLUMN messages_deleted   SET DEFAULT 0;
+
+-- Every chat gets its counters row, whoever creates the chat
+CREATE OR REPLACE FUNCTION chats_create_counters()
+RETURNS trigger AS $$
+BEGIN
+  INSERT INTO chat_counters (chat_id) VALUES (NEW.id)
+  ON CONFLICT (chat_id) DO NOTHING;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_chats_create_counters ON chats;
+CREATE TRIGGER trg_chats_create_counters
+AFTER INSERT ON chats
+FOR EACH ROW
+EXECUTE FUNCTION chats_create_counters();
+
+-- Stats buckets (0009) now follow the counters table
+DROP TRIGGER IF EXISTS trg_chats_stats_buckets ON chats;
+DROP FUNCTION IF EXISTS chats_stats_buckets();
+
+CREATE OR REPLACE FUNCTION chat_counters_stats_buckets()
+RETURNS trigger AS $$
+BEGIN
+  INSERT INTO chat_stats_buckets (
+    chat_id, granularity, bucket_start,
+    processed_messages, spam_detected, messages_deleted
+  )
+  VALUES (
+    NEW.chat_id, 'minute', date_trunc('minute', now()),
+    GREATEST(NEW.processed_messages - OLD.processed_messages, 0),
+    GREATEST(NEW.spam_detected      - OLD.spam_detected,      0),
+    GREATEST(NEW.messages_deleted   - OLD.messages_deleted,   0)
+  )
+  ON CONFLICT ON CONSTRAINT uk_chat_stats_buckets_chat_gran_start DO UPDATE
+     SET processed_messages = chat_stats_buckets.processed_messages + EXCLUDED.processed_messages,
+         spam_detected      = chat_stats_buckets.spam_detected      + EXCLUDED.spam_detected,
+         messages_deleted   = chat_stats_buckets.messages_deleted   + EXCLUDED.messages_deleted;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_chat_counters_stats_buckets ON chat_counters;
+CREATE TRIGGER trg_chat_counters_stats_buckets
+AFTER UPDATE ON chat_counters
+FOR EACH ROW
+WHEN (
+  NEW.processed_messages > OLD.processed_messages
+  OR NEW.spam_detected > OLD.spam_detected
+  OR NEW.messages_deleted > OLD.messages_deleted
+)
+EXECUTE FUNCTION chat_counters_stats_buckets();
+
+-- Carry the values over; block writers so none are lost in between
+LOCK TABLE chats IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO chat_counters (chat_id, processed_messages, spam_detected, messages_deleted)
+SELECT id, processed_messages, spam_detected, messages_deleted
+  FROM chats
+ON CONFLICT (chat_id) DO UPDATE
+   SET processed_messages = EXCLUDED.processed_messages,
+       spam_detected      = EXCLUDED.spam_detected,
+       messages_deleted   = EXCLUDED.messages_deleted;
+"""
+
+# Runs after the chats columns have been re-added (RemoveField reversed)
+REVERSE_SQL = """
+UPDATE chats c
+   SET processed_messages = k.processed_messages,
+       spam_detected      = k.spam_detected,
+       messages_deleted   = k.messages_deleted
+  FROM chat_counters k
+ WHERE k.chat_id = c.id;
+
+DROP TRIGGER IF EXISTS trg_chat_counters_stats_buckets ON chat_counters;
+DROP FUNCTION IF EXISTS chat_counters_stats_buckets();
+DROP TRIGGER IF EXISTS trg_chats_create_counters ON chats;
+DROP FUNCTION IF EXISTS chats_create_counters();
+
+CREATE OR REPLACE FUNCTION chats_stats_buckets()
+RETURNS trigger AS $$
+BEGIN
+  INSERT INTO chat_stats_buckets (
+    chat_id, granularity, bucket_start,
+    processed_messages, spam_detected, messages_deleted
+  )
+  VALUES (
+    NEW.id, 'minute', date_trunc('minute', now()),
+    GREATEST(NEW.processed_messages - OLD.processed_messages, 0),
+    GREATEST(NEW.spam_detected      - OLD.spam_detected,      0),
+    GREATEST(NEW.messages_deleted   - OLD.messages_deleted,   0)
+  )
+  ON CONFLICT ON CONSTRAINT uk_chat_stats_buckets_chat_gran_start DO UPDATE
+     SET processed_messages = chat_stats_buckets.processed_messages + EXCLUDED.processed_messages,
+         spam_detected      = chat_stats_buckets.spam_detected      + EXCLUDED.spam_detected,
+         messages_deleted   = chat_stats_buckets.messages_deleted   + EXCLUDED.messages_deleted;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_chats_stats_buckets
+AFTER UPDATE OF processed_messages, spam_detected, messages_deleted ON chats
+FOR EACH ROW
+WHEN (
+  NEW.processed_messages > OLD.processed_messages
+  OR NEW.spam_detected > OLD.spam_detected
+  OR NEW.messages_deleted > OLD.messages_deleted
+)
+EXECUTE FUNCTION chats_stats_buckets();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_chat_stats_buckets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatCounter',
+            fields=[
+                ('chat', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='core.chat')),
+                ('processed_messages', models.BigIntegerField(default=0)),
+                ('spam_detected', models.BigIntegerField(default=0)),
+                ('messages_deleted', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'chat_counters',
+            },
+        ),
+        migrations.RunSQL(SQL, REVERSE_SQL),
+        migrations.RemoveField(
+            model_name='chat',
+            name='messages_deleted',
+        ),
+        migrations.RemoveField(
+            model_name='chat',
+            name='processed_messages',
+        ),
+        migrations.RemoveField(
+            model_name='chat',
+            name='spam_detected',
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+
+# Keep one row per (chat, external user): the trusted / most active / oldest
+# one, carrying over the best values of its duplicates. The member-count
+# triggers (0007) follow the deletes and the trusted flag changes.
+DEDUPE_SQL = """
+LOCK TABLE user_states IN SHARE ROW EXCLUSIVE MODE;
+
+WITH ranked AS (
+  SELECT id,
+         count(*)            OVER member AS copies,
+         row_number()        OVER (PARTITION BY chat_id, external_user_id
+                                   ORDER BY trusted DESC, valid_messages DESC,
+                                            created_at, id) AS rn,
+         bool_or(trusted)    OVER member AS any_trusted,
+         max(valid_messages) OVER member AS max_valid_messages,
+         min(joined_at)      OVER member AS first_joined_at
+    FROM user_states
+  WINDOW member AS (PARTITION BY chat_id, external_user_id)
+),
+merged AS (
+  UPDATE user_states u
+     SET trusted        = r.any_trusted,
+         valid_messages = r.max_valid_messages,
+         joined_at      = r.first_joined_at
+    FROM ranked r
+   WHERE u.id = r.id
+     AND r.rn = 1
+     AND r.copies > 1
+)
+DELETE FROM user_states u
+ USING ranked r
+ WHERE u.id = r.id
+   AND r.rn > 1;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_chat_counters'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DEDUPE_SQL, migrations.RunSQL.noop),
+        migrations.RemoveIndex(
+            model_name='userstate',
+            name='idx_user_states_chat_extuser',
+        ),
+        migrations.AddConstraint(
+            model_name='userstate',
+            constraint=models.UniqueConstraint(fields=('chat', 'external_user_id'), name='uk_user_states_chat_external_user'),
+        ),
+    ]
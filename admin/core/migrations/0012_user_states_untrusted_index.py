@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_user_states_unique_member'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userstate',
+            index=models.Index(condition=models.Q(('is_active', True), ('trusted', False)), fields=['chat', 'valid_messages'], name='idx_user_states_untrusted'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_user_states_untrusted_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='runtimestatistics',
+            name='last_flush_batch',
+            field=models.BigIntegerField(db_default=0, editable=False),
+        ),
+    ]
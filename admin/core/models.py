@@ -1,5 +1,6 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
+from django.utils import timezone
 
 from .models_base import BaseModel
 
@@ -93,9 +94,8 @@ class Chat(BaseModel):
         blank=True,
     )
 
-    processed_messages = models.IntegerField(default=0)
-    spam_detected = models.IntegerField(default=0)
-    messages_deleted = models.IntegerField(default=0)
+    # processed_messages / spam_detected / messages_deleted live in
+    # ChatCounter (chat.counters)
 
     min_messages_required = models.IntegerField(default=20)
     min_observation_minutes = models.IntegerField(default=60)
@@ -108,6 +108,12 @@ class Chat(BaseModel):
                 name="uk_chats_type_platform_chat_id",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="idx_chats_user_created",
+            ),
+        ]
 
 
 class Prompt(BaseModel):
@@ -116,6 +122,12 @@ class Prompt(BaseModel):
 
     class Meta:  # pyright: ignore[reportIncompatibleVariableOverride]
         db_table = "prompts"
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"],
+                name="idx_prompts_created",
+            ),
+        ]
 
 
 class CustomPrompt(BaseModel):
@@ -128,6 +140,12 @@ class CustomPrompt(BaseModel):
 
     class Meta:  # pyright: ignore[reportIncompatibleVariableOverride]
         db_table = "custom_prompts"
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="idx_cprompts_user_created",
+            ),
+        ]
 
 
 class UserState(BaseModel):
@@ -145,14 +163,108 @@ class UserState(BaseModel):
 
     class Meta:  # pyright: ignore[reportIncompatibleVariableOverride]
         db_table = "user_states"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["chat", "external_user_id"],
+                name="uk_user_states_chat_external_user",
+            )
+        ]
         indexes = [
             models.Index(
-                fields=["chat", "external_user_id"],
-                name="idx_user_states_chat_extuser",
+                fields=["chat", "updated_at", "id"],
+                name="idx_user_states_chat_updated",
+            ),
+            # auto-trust sweep candidates only (backend AutoTrustSweeper)
+            models.Index(
+                fields=["chat", "valid_messages"],
+                name="idx_user_states_untrusted",
+                condition=models.Q(trusted=False, is_active=True),
             ),
         ]
 
 
+class ChatMemberCount(models.Model):
+    """
+    Per-chat trusted/untrusted member totals.
+
+    Maintained by a trigger on user_states (migration 0007), never written
+    by application code.
+    """
+
+    chat = models.OneToOneField(
+        Chat,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="member_count",
+    )
+    trusted_count = models.BigIntegerField(default=0)
+    untrusted_count = models.BigIntegerField(default=0)
+
+    class Meta:  # pyright: ignore[reportIncompatibleVariableOverride]
+        db_table = "chat_member_counts"
+
+
+class ChatCounter(models.Model):
+    """
+    Per-chat message counters, bumped on every processed message.
+
+    Kept out of `chats` so an increment rewrites a narrow row (fillfactor 50,
+    HOT-friendly, migration 0010) instead of the wide settings row, and does
+    not bump chats.updated_at. The row is created by a trigger on chats.
+    """
+
+    chat = models.OneToOneField(
+        Chat,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="counters",
+    )
+    processed_messages = models.BigIntegerField(default=0)
+    spam_detected = models.BigIntegerField(default=0)
+    messages_deleted = models.BigIntegerField(default=0)
+
+    class Meta:  # pyright: ignore[reportIncompatibleVariableOverride]
+        db_table = "chat_counters"
+
+
+class ChatStatsBucket(models.Model):
+    """
+    Per-chat message counters aggregated into time buckets.
+
+    Minute buckets are written by a trigger on chat_counters (migrations
+    0009, 0010); the backend rollup job folds them into hour and then day
+    buckets as they age.
+    """
+
+    GRANULARITY_CHOICES = [
+        ("minute", "Minute"),
+        ("hour", "Hour"),
+        ("day", "Day"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    chat = models.ForeignKey(
+        Chat,
+        on_delete=models.CASCADE,
+        related_name="stats_buckets",
+    )
+    granularity = models.CharField(max_length=8, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+
+    processed_messages = models.BigIntegerField(default=0)
+    spam_detected = models.BigIntegerField(default=0)
+    messages_deleted = models.BigIntegerField(default=0)
+
+    class Meta:  # pyright: ignore[reportIncompatibleVariableOverride]
+        db_table = "chat_stats_buckets"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["chat", "granularity", "bucket_start"],
+                name="uk_chat_stats_buckets_chat_gran_start",
+            )
+        ]
+
+
 class ChatPrompt(BaseModel):
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE)
     prompt = models.ForeignKey(Prompt, on_delete=models.CASCADE)
@@ -210,5 +322,29 @@ class RuntimeStatistics(BaseModel):
         unique=True,
     )
 
+    # Id of the last backend write-behind flush applied to this row; makes
+    # a retried flush a no-op
+    last_flush_batch = models.BigIntegerField(db_default=0, editable=False)
+
     class Meta:  # pyright: ignore[reportIncompatibleVariableOverride]
         db_table = "runtime_statistics"
+
+
+class OutboxEvent(models.Model):
+    """
+    Transactional outbox for change events.
+
+    Rows are written by the backend in the same transaction as the change
+    and relayed (then deleted) by the backend to a Redis stream.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    aggregate_type = models.CharField(max_length=32)
+    aggregate_id = models.UUIDField()
+    chat_id = models.UUIDField(null=True, blank=True)
+    event_type = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:  # pyright: ignore[reportIncompatibleVariableOverride]
+        db_table = "outbox_events"
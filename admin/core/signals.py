@@ -0,0 +1,49 @@
+import logging
+
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import User
+
+log = logging.getLogger(__name__)
+
+# Must match backend/cache/user_cache.py
+USER_CACHE_PREFIX = "user_cache:"
+USER_CACHE_CHANNEL = "user_cache:invalidate"
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=1,
+            socket_connect_timeout=1,
+        )
+    return _client
+
+
+def _invalidate_user_cache(user_id) -> None:
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        pipe.delete(f"{USER_CACHE_PREFIX}{user_id}")
+        pipe.publish(USER_CACHE_CHANNEL, str(user_id))
+        pipe.execute()
+    except redis.RedisError:
+        # The backend entry still expires on its own TTL
+        log.warning("Could not invalidate cached user %s", user_id)
+
+
+def invalidate_user_cache(sender, instance, **kwargs) -> None:
+    # After commit, so the backend cannot re-cache the old row
+    user_id = instance.pk
+    transaction.on_commit(lambda: _invalidate_user_cache(user_id))
+
+
+def connect() -> None:
+    post_save.connect(invalidate_user_cache, sender=User)
+    post_delete.connect(invalidate_user_cache, sender=User)
@@ -102,6 +102,9 @@ DATABASES = {
     }
 }
 
+# Shared with the backend, used to invalidate its user cache
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
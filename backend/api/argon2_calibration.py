@@ -0,0 +1,93 @@
+"""
+Benchmark argon2 on this host and pick costs for a target verify latency.
+
+    uv run python -m api.argon2_calibration --target-ms 50
+
+Prints ARGON2_* lines to put into the backend .env. Changing them makes
+existing hashes "need update"; they are rehashed on the next login.
+"""
+import argparse
+import statistics
+import time
+
+from argon2 import PasswordHasher
+
+from settings import settings
+
+
+MIN_MEMORY_KIB = 19 * 1024  # OWASP minimum for argon2id
+MAX_TIME_COST = 10
+
+
+def measure_verify_ms(
+    time_cost: int,
+    memory_cost: int,
+    parallelism: int,
+    rounds: int = 5,
+) -> float:
+    ph = PasswordHasher(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+    )
+    password = "calibration-password"
+    password_hash = ph.hash(password)
+
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        ph.verify(password_hash, password)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def calibrate(
+    target_ms: float,
+    max_memory_kib: int,
+    parallelism: int,
+) -> dict[str, int | float]:
+    """
+    Use as much memory as fits the target with time_cost=1 (memory-hardness
+    first), then raise time_cost while verify stays within the target.
+    """
+    memory_cost = max_memory_kib
+    while (
+        memory_cost > MIN_MEMORY_KIB
+        and measure_verify_ms(1, memory_cost, parallelism) > target_ms
+    ):
+        memory_cost = max(memory_cost // 2, MIN_MEMORY_KIB)
+
+    time_cost = 1
+    elapsed = measure_verify_ms(time_cost, memory_cost, parallelism)
+    while time_cost < MAX_TIME_COST:
+        candidate = measure_verify_ms(time_cost + 1, memory_cost, parallelism)
+        if candidate > target_ms:
+            break
+        time_cost += 1
+        elapsed = candidate
+
+    return {
+        "time_cost": time_cost,
+        "memory_cost": memory_cost,
+        "parallelism": parallelism,
+        "verify_ms": round(elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--target-ms", type=float, default=settings.ARGON2_TARGET_MS)  # noqa: E501
+    parser.add_argument("--max-memory-kib", type=int, default=256 * 1024)
+    parser.add_argument("--parallelism", type=int, default=4)
+    args = parser.parse_args()
+
+    result = calibrate(args.target_ms, args.max_memory_kib, args.parallelism)
+
+    print(f"# argon2 verify ~{result['verify_ms']} ms (target {args.target_ms} ms)")  # noqa: E501
+    print(f"ARGON2_TIME_COST={result['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={result['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={result['parallelism']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 __all__ = [
     "Ordering",
+    "Keyset",
+    "ConditionalGet",
 ]
 
 
 from .ordering import Ordering
+from .pagination import Keyset
+from .etag import ConditionalGet
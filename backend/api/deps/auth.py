@@ -6,6 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.security import decode_token
+from cache import user_cache
 from database import db_helper
 from database.models import Users
 from logger import get_logger
@@ -34,6 +35,11 @@ async def get_current_user(
         log.error(f"Authentication failed: Invalid token - {str(e)}")
         raise HTTPException(status_code=401, detail="Invalid token")
 
+    user = await user_cache.get(user_id)
+    if user is not None:
+        log.debug(f"Authenticated user from cache: {user_id}")
+        return user
+
     stmt = select(Users).where(
         Users.id == user_id,
         Users.is_active == True,  # noqa: E712
@@ -45,5 +51,7 @@ async def get_current_user(
         log.warning(f"Authentication failed: User not found or inactive - {user_id}")
         raise HTTPException(status_code=401, detail="User not found")
 
+    await user_cache.set(user)
+
     log.info(f"Successfully authenticated user: {user.id}")
     return user
@@ -0,0 +1,112 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Header, HTTPException, Request, Response
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 If-None-Match check (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    target = opaque(etag)
+    return any(opaque(tag) == target for tag in if_none_match.split(","))
+
+
+class ConditionalGet:
+    """
+    ETag / Last-Modified validator for read endpoints (FastAPI dependency).
+
+    Call one of the `check*` methods before building the response. If the
+    client's validator still matches, a bodyless 304 is raised; otherwise
+    the ETag/Last-Modified headers are set on the response.
+
+    The ETag hashes the request URL (path + query, so every page/filter
+    has its own tag), a caller-supplied scope (e.g. the user id) and the
+    probe values.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        if_none_match: Optional[str] = Header(None),
+        if_modified_since: Optional[str] = Header(None),
+    ):
+        self.request = request
+        self.response = response
+        self.if_none_match = if_none_match
+        self.if_modified_since = if_modified_since
+
+    def _not_modified_since(self, last_modified: datetime) -> bool:
+        if self.if_none_match is not None or not self.if_modified_since:
+            return False
+        try:
+            since = parsedate_to_datetime(self.if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have second precision
+        return last_modified.replace(microsecond=0) <= since
+
+    def check(
+        self,
+        *parts: Any,
+        last_modified: Optional[datetime] = None,
+        use_if_modified_since: bool = False,
+    ) -> str:
+        url = self.request.url
+        raw = "|".join([url.path, url.query] + [str(p) for p in parts])
+        etag = f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                last_modified.astimezone(timezone.utc),
+                usegmt=True,
+            )
+
+        if etag_matches(self.if_none_match, etag) or (
+            use_if_modified_since
+            and last_modified is not None
+            and self._not_modified_since(last_modified)
+        ):
+            raise HTTPException(status_code=304, headers=headers)
+
+        self.response.headers.update(headers)
+        return etag
+
+    def check_detail(self, obj: Any) -> str:
+        """Validate a single row by its identity and updated_at."""
+        return self.check(
+            obj.id,
+            obj.updated_at.isoformat(),
+            last_modified=obj.updated_at,
+            use_if_modified_since=True,
+        )
+
+    async def check_probe(
+        self,
+        session: AsyncSession,
+        probe: Select,
+        scope: Any = None,
+    ) -> str:
+        """
+        Validate a list by a cheap probe query, conventionally
+        `select(max(updated_at), count(*), ...)` over the filtered set.
+        If-Modified-Since is not honoured: deletions don't move max().
+        """
+        row = (await session.execute(probe)).one()
+        last_modified = row[0] if isinstance(row[0], datetime) else None
+        return self.check(scope, *row, last_modified=last_modified)
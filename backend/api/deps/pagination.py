@@ -0,0 +1,79 @@
+import base64
+from datetime import datetime
+from typing import Any, Optional, Sequence, Type
+from uuid import UUID
+
+import orjson
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import DeclarativeBase
+
+
+class Keyset:
+    """
+    Keyset (cursor) pagination over `(<timestamp field>, id)`.
+
+    The cursor is an opaque base64 token holding the last row's key. Pages
+    are fetched with a row comparison, so they are served from the matching
+    composite index no matter how deep the page is, and the `id` tiebreaker
+    keeps the order stable.
+    """
+
+    def __init__(
+        self,
+        model: Type[DeclarativeBase],
+        field: str = "created_at",
+        descending: bool = False,
+    ):
+        self.field = field
+        self.ts_column = getattr(model, field)
+        self.id_column = getattr(model, "id")
+        self.descending = descending
+
+    def order_by(self) -> list[Any]:
+        if self.descending:
+            return [self.ts_column.desc(), self.id_column.desc()]
+        return [self.ts_column, self.id_column]
+
+    def apply(
+        self,
+        stmt: Select,
+        cursor: Optional[str],
+        limit: int,
+    ) -> Select:
+        """Filter after `cursor`, order by the key and fetch one extra row."""
+        if cursor is not None:
+            ts, row_id = decode_cursor(cursor)
+            key = tuple_(self.ts_column, self.id_column)
+            stmt = stmt.where(
+                key < tuple_(ts, row_id)
+                if self.descending
+                else key > tuple_(ts, row_id)
+            )
+        return stmt.order_by(*self.order_by()).limit(limit + 1)
+
+    def page(
+        self,
+        rows: Sequence[Any],
+        limit: int,
+    ) -> tuple[list[Any], Optional[str]]:
+        """Split the `limit + 1` rows into the page and the next cursor."""
+        items = list(rows[:limit])
+        if len(rows) <= limit or not items:
+            return items, None
+        last = items[-1]
+        return items, encode_cursor(getattr(last, self.field), last.id)
+
+
+def encode_cursor(ts: datetime, row_id: UUID) -> str:
+    raw = orjson.dumps([ts.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        ts, row_id = orjson.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(ts), UUID(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
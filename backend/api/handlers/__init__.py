@@ -4,12 +4,24 @@ from .auth import router as auth_router
 from .prompt import router as prompts_router
 from .chat import router as chat_router
 from .user_state import router as user_state_router
+from .user_state_io import router as user_state_io_router
 from .deleted_messages import router as deleted_messages_router
+from .health import router as health_router
+from .policy import router as policy_router
+from .stats import router as stats_router
+from .stats import runtime_router as runtime_stats_router
+from .dashboard import router as dashboard_router
 
 router = APIRouter()
 
 router.include_router(auth_router)
 router.include_router(prompts_router)
 router.include_router(chat_router)
+router.include_router(user_state_io_router)
 router.include_router(user_state_router)
 router.include_router(deleted_messages_router)
+router.include_router(health_router)
+router.include_router(policy_router)
+router.include_router(stats_router)
+router.include_router(runtime_stats_router)
+router.include_router(dashboard_router)
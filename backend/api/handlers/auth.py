@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+)
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.deps import ConditionalGet
 from api.deps.auth import get_current_user
-from api.security import create_access_token, hash_password, verify_password
+from api.hashing import HashingOverloaded, password_hasher
+from api.login_governor import LoginRejected, login_governor
+from api.security import create_access_token, password_needs_rehash
+from cache import user_cache
 from database import db_helper
 from database.models import Users
 from database.schemas.users import (
@@ -23,6 +35,14 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 get_session = db_helper.session_getter
 
 
+def _hashing_overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server busy, try again later",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post("/register", response_model=UserResponse, status_code=201)
 async def register(
     payload: UserRegister,
@@ -35,11 +55,16 @@ async def register(
         log.warning(f"Registration failed: Email already registered: {payload.email}")  # noqa: E501
         raise HTTPException(status_code=409, detail="Email already registered")
 
+    try:
+        password_hash = await password_hasher.hash(payload.password)
+    except HashingOverloaded:
+        raise _hashing_overloaded()
+
     user = Users(
         is_active=True,
         email=str(payload.email),
         username=payload.username,
-        password_hash=hash_password(payload.password),
+        password_hash=password_hash,
     )
 
     session.add(user)
@@ -51,12 +76,31 @@ async def register(
     return UserResponse.model_validate(user)
 
 
-@router.post("/login", response_model=TokenResponse)
-async def login(
-    payload: UserLogin,
-    session: AsyncSession = Depends(get_session),
-) -> TokenResponse:
-    log.info(f"Processing login request for user: {payload.email}")
+async def _rehash_password(
+    user_id: UUID,
+    old_hash: str,
+    password: str,
+) -> None:
+    """Upgrade a hash made with outdated argon2 parameters (best effort)."""
+    try:
+        new_hash = await password_hasher.hash(password)
+    except HashingOverloaded:
+        log.info(f"Skipping password rehash for user {user_id}: pool busy")
+        return
+
+    async with db_helper.session_factory() as session:
+        # Guard against a concurrent password change
+        await session.execute(
+            update(Users)
+            .where(Users.id == user_id, Users.password_hash == old_hash)
+            .values(password_hash=new_hash)
+        )
+        await session.commit()
+
+    log.info(f"Rehashed password with current argon2 parameters: {user_id}")
+
+
+async def _authenticate(payload: UserLogin, session: AsyncSession) -> Users:
     stmt = select(Users).where(Users.email == str(payload.email))
     res = await session.execute(stmt)
     user = res.scalar_one_or_none()
@@ -65,7 +109,15 @@ async def login(
         log.warning(f"Login failed: Invalid credentials for user: {payload.email}")  # noqa: E501
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(payload.password, user.password_hash):
+    try:
+        password_ok = await password_hasher.verify(
+            payload.password,
+            user.password_hash,
+        )
+    except HashingOverloaded:
+        raise _hashing_overloaded()
+
+    if not password_ok:
         log.warning(f"Login failed: Invalid password for user: {payload.email}")  # noqa: E501
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -73,6 +125,37 @@ async def login(
         log.warning(f"Login failed: User account inactive: {payload.email}")
         raise HTTPException(status_code=403, detail="User inactive")
 
+    return user
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login(
+    payload: UserLogin,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session),
+) -> TokenResponse:
+    log.info(f"Processing login request for user: {payload.email}")
+    client_ip = request.client.host if request.client else "unknown"
+
+    try:
+        async with login_governor.admit(client_ip, str(payload.email)):
+            user = await _authenticate(payload, session)
+    except LoginRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+    if password_needs_rehash(user.password_hash):
+        background_tasks.add_task(
+            _rehash_password,
+            user.id,
+            user.password_hash,
+            payload.password,
+        )
+
     token = create_access_token(
         sub=user.id,
         ttl_minutes=settings.JWT_ACCESS_TTL_MIN,
@@ -86,18 +169,31 @@ async def login(
 @router.get("/me", response_model=UserResponse)
 async def me(
     current_user: Users = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
 ) -> UserResponse:
     log.debug(f"Retrieving user profile for user: {current_user.id}")
+    conditional.check_detail(current_user)
     return UserResponse.model_validate(current_user)
 
 
 @router.get("/me/connect_telegram", response_model=TelegramConnectResponse)
 async def connect_telegram(
     current_user: Users = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
 ) -> TelegramConnectResponse:
     log.debug(f"Processing Telegram connection for user: {current_user.id}")
 
-    if current_user.telegram_user_id is not None:
+    telegram_user_id = current_user.telegram_user_id
+    if telegram_user_id is None:
+        # Linking is done by the bot, so the cached identity may be stale
+        res = await session.execute(
+            select(Users.telegram_user_id).where(Users.id == current_user.id)
+        )
+        telegram_user_id = res.scalar_one_or_none()
+        if telegram_user_id is not None:
+            await user_cache.invalidate(current_user.id)
+
+    if telegram_user_id is not None:
         return TelegramConnectResponse(
             status="already_connected",
             message="You are already connected to a Telegram account",
@@ -1,3 +1,4 @@
+import uuid
 from typing import Optional
 from uuid import UUID
 
@@ -8,11 +9,29 @@ from fastapi import (
     Query,
     status,
 )
-from sqlalchemy import select
+from sqlalchemy import (
+    Boolean,
+    Double,
+    Integer,
+    Uuid,
+    case,
+    column,
+    delete,
+    func,
+    literal,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.deps import ConditionalGet, Keyset
 from api.deps.auth import get_current_user
+from cache import dashboard_cache, policy_cache
 from database import db_helper
+from database.outbox import ChangeEvent, emit_changes
+from database.writes import chat_owned_by, delete_returning, update_returning
 from database.models import (
     Chats,
     Users,
@@ -22,8 +41,10 @@ from database.models import (
     ChatCustomPrompts,
 )
 from database.schemas.chat import (
+    ChatSettingsBulkUpdate,
     ChatSettingsResponse,
     ChatSettingsUpdate,
+    ChatsBulkUpdateResponse,
     ChatsList,
 )
 from database.schemas import (
@@ -32,6 +53,10 @@ from database.schemas import (
     ChatPromptLinkResponse,
     ChatCustomPromptLinkResponse,
     ChatLinksResponse,
+    ChatPromptLinksReplace,
+    ChatCustomPromptLinksReplace,
+    ChatPromptLinksList,
+    ChatCustomPromptLinksList,
 )
 from logger import get_logger
 
@@ -42,6 +67,40 @@ get_session = db_helper.session_getter
 
 router = APIRouter(prefix="/chats", tags=["chats"])
 
+chats_keyset = Keyset(model=Chats, field="created_at")
+
+
+def _chat_settings_event(
+    chat: Chats | ChatSettingsResponse,
+    fields: list[str],
+) -> ChangeEvent:
+    return ChangeEvent(
+        aggregate_type="chat",
+        aggregate_id=chat.id,
+        chat_id=chat.id,
+        event_type="chat.settings_updated",
+        payload={
+            "platform_chat_id": chat.platform_chat_id,
+            "type": chat.type,
+            "fields": fields,
+        },
+    )
+
+
+def _link_event(
+    chat_id: UUID,
+    kind: str,
+    target_id: UUID,
+    event_type: str,
+) -> ChangeEvent:
+    return ChangeEvent(
+        aggregate_type="chat",
+        aggregate_id=chat_id,
+        chat_id=chat_id,
+        event_type=event_type,
+        payload={"kind": kind, "target_id": str(target_id)},
+    )
+
 
 @router.get("", response_model=ChatsList)
 async def list_my_chats(
@@ -49,33 +108,125 @@ async def list_my_chats(
     current_user=Depends(get_current_user),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     chat_type: Optional[str] = Query(None),
+    conditional: ConditionalGet = Depends(),
 ) -> ChatsList:
     log.debug(
-        f"Listing chats for user: {current_user.id}, limit: {limit}, offset: {offset}"  # noqa: E501
+        f"Listing chats for user: {current_user.id}, limit: {limit}, offset: {offset}, cursor: {cursor}"  # noqa: E501
     )  # noqa: E501
-    stmt = (
-        select(Chats)
-        .where(Chats.user_id == current_user.id)
-        .offset(offset)
-        .limit(limit)
-    )
+    conditions = [Chats.user_id == current_user.id]
 
     if is_active is not None:
-        stmt = stmt.where(Chats.is_active == is_active)
+        conditions.append(Chats.is_active == is_active)
         log.debug(f"Filtering by is_active: {is_active}")
 
     if chat_type is not None:
-        stmt = stmt.where(Chats.type == chat_type)
+        conditions.append(Chats.type == chat_type)
         log.debug(f"Filtering by chat_type: {chat_type}")
 
+    await conditional.check_probe(
+        session,
+        select(func.max(Chats.updated_at), func.count()).where(*conditions),
+        scope=current_user.id,
+    )
+
+    stmt = select(Chats).where(*conditions)
+
+    # cursor takes precedence over offset
+    stmt = chats_keyset.apply(stmt, cursor, limit)
+    if cursor is None:
+        stmt = stmt.offset(offset)
+
     res = await session.execute(stmt)
-    items = res.scalars().all()
+    items, next_cursor = chats_keyset.page(res.scalars().all(), limit)
 
     log.info(f"Found {len(items)} chats for user: {current_user.id}")
     parsed = [ChatSettingsResponse.model_validate(x) for x in items]
-    return ChatsList(chats=parsed)
+    return ChatsList(chats=parsed, next_cursor=next_cursor)
+
+
+@router.patch("", response_model=ChatsBulkUpdateResponse)
+async def bulk_update_my_chats_settings(
+    payload: ChatSettingsBulkUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+) -> ChatsBulkUpdateResponse:
+    shared = (
+        payload.settings.model_dump(exclude_unset=True)
+        if payload.settings
+        else {}
+    )
+    patches: dict[UUID, dict] = {chat_id: dict(shared) for chat_id in payload.chat_ids}  # noqa: E501
+    for patch in payload.patches:
+        data = patch.model_dump(exclude_unset=True, exclude={"id"})
+        patches.setdefault(patch.id, {}).update(data)
+
+    patches = {k: v for k, v in patches.items() if v}
+    if not patches:
+        raise HTTPException(status_code=422, detail="Nothing to update")
+
+    log.info(
+        f"Bulk updating settings of {len(patches)} chats by user: {current_user.id}"  # noqa: E501
+    )
+
+    # One row per chat: (id, <field>, set_<field>, ...). The set_ flag lets
+    # a row leave a field untouched while still allowing explicit NULLs.
+    fields = sorted({f for data in patches.values() for f in data})
+    table = Chats.__table__
+    cols = [column("id", Uuid)]
+    for f in fields:
+        cols += [column(f, table.c[f].type), column(f"set_{f}", Boolean)]
+
+    rows = []
+    for chat_id, data in patches.items():
+        row: list = [chat_id]
+        for f in fields:
+            row += [data.get(f), f in data]
+        rows.append(tuple(row))
+
+    patch = values(*cols, name="patch").data(rows)
+    stmt = (
+        update(Chats)
+        .where(
+            Chats.id == patch.c.id,
+            Chats.user_id == current_user.id,
+        )
+        .values(
+            {
+                f: case(
+                    (patch.c[f"set_{f}"], patch.c[f]),
+                    else_=table.c[f],
+                )
+                for f in fields
+            }
+        )
+        .returning(Chats)
+        .execution_options(synchronize_session=False)
+    )
+
+    res = await session.execute(stmt)
+    updated = res.scalars().all()
+    await emit_changes(
+        session,
+        *[_chat_settings_event(x, list(patches[x.id])) for x in updated],
+    )
+    await session.commit()
+    for x in updated:
+        policy_cache.pop(x.id)
+    dashboard_cache.pop(current_user.id)
+
+    updated_ids = {x.id for x in updated}
+    not_found = [x for x in patches if x not in updated_ids]
+
+    log.info(
+        f"Bulk updated {len(updated)} chats, {len(not_found)} not found, user: {current_user.id}"  # noqa: E501
+    )
+    return ChatsBulkUpdateResponse(
+        chats=[ChatSettingsResponse.model_validate(x) for x in updated],
+        not_found=not_found,
+    )
 
 
 @router.get("/{chat_id}", response_model=ChatSettingsResponse)
@@ -83,6 +234,7 @@ async def get_my_chat(
     chat_id: UUID,
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
 ) -> ChatSettingsResponse:
     log.debug(f"Retrieving chat {chat_id} for user: {current_user.id}")
     stmt = select(Chats).where(
@@ -96,6 +248,8 @@ async def get_my_chat(
         log.warning(f"Chat {chat_id} not found for user: {current_user.id}")
         raise HTTPException(status_code=404, detail="Chat not found")
 
+    conditional.check_detail(obj)
+
     log.info(f"Successfully retrieved chat {chat_id} for user: {current_user.id}")  # noqa: E501
     return ChatSettingsResponse.model_validate(obj)
 
@@ -108,27 +262,24 @@ async def update_my_chat_settings(
     current_user=Depends(get_current_user),
 ) -> ChatSettingsResponse:
     log.info(f"Updating chat settings for chat {chat_id} by user: {current_user.id}")  # noqa: E501
-    stmt = select(Chats).where(
-        Chats.id == chat_id,
-        Chats.user_id == current_user.id,
-    )
-    res = await session.execute(stmt)
-    obj = res.scalar_one_or_none()
-
-    if obj is None:
-        log.warning(f"Chat {chat_id} not found for user: {current_user.id}")
-        raise HTTPException(status_code=404, detail="Chat not found")
-
     data = payload.model_dump(exclude_unset=True)
     log.debug(f"Updating chat {chat_id} with data: {data}")
-    for k, v in data.items():
-        setattr(obj, k, v)
+    obj = await update_returning(
+        session,
+        Chats,
+        [Chats.id == chat_id, Chats.user_id == current_user.id],
+        data,
+        ChatSettingsResponse,
+        not_found="Chat not found",
+    )
 
+    await emit_changes(session, _chat_settings_event(obj, list(data)))
     await session.commit()
-    await session.refresh(obj)
+    policy_cache.pop(chat_id)
+    dashboard_cache.pop(current_user.id)
 
     log.info(f"Successfully updated chat settings for chat {chat_id}")
-    return ChatSettingsResponse.model_validate(obj)
+    return obj
 
 
 async def _get_my_chat_or_404(
@@ -151,9 +302,32 @@ async def list_chat_links(
     chat_id: UUID,
     session: AsyncSession = Depends(get_session),
     current_user: Users = Depends(get_current_user),
+    conditional: ConditionalGet = Depends(),
 ) -> ChatLinksResponse:
     await _get_my_chat_or_404(session, current_user, chat_id)
 
+    await conditional.check_probe(
+        session,
+        select(
+            func.greatest(
+                select(func.max(ChatPrompts.updated_at))
+                .where(ChatPrompts.chat_id == chat_id)
+                .scalar_subquery(),
+                select(func.max(ChatCustomPrompts.updated_at))
+                .where(ChatCustomPrompts.chat_id == chat_id)
+                .scalar_subquery(),
+            ),
+            select(func.count())
+            .select_from(ChatPrompts)
+            .where(ChatPrompts.chat_id == chat_id)
+            .scalar_subquery(),
+            select(func.count())
+            .select_from(ChatCustomPrompts)
+            .where(ChatCustomPrompts.chat_id == chat_id)
+            .scalar_subquery(),
+        ),
+    )
+
     stmt_p = select(ChatPrompts).where(ChatPrompts.chat_id == chat_id)
     stmt_cp = select(ChatCustomPrompts).where(
         ChatCustomPrompts.chat_id == chat_id
@@ -212,7 +386,13 @@ async def create_chat_prompt_link(
         threshold=payload.threshold,
     )
     session.add(obj)
+    await emit_changes(
+        session,
+        _link_event(chat_id, "prompts", payload.prompt_id, "chat.link_created"),  # noqa: E501
+    )
     await session.commit()
+    policy_cache.pop(chat_id)
+    dashboard_cache.pop(current_user.id)
     await session.refresh(obj)
 
     return ChatPromptLinkResponse.model_validate(obj)
@@ -228,20 +408,23 @@ async def delete_chat_prompt_link(
     session: AsyncSession = Depends(get_session),
     current_user: Users = Depends(get_current_user),
 ) -> None:
-    await _get_my_chat_or_404(session, current_user, chat_id)
-
-    stmt_find = select(ChatPrompts).where(
-        ChatPrompts.chat_id == chat_id,
-        ChatPrompts.prompt_id == prompt_id,
+    await delete_returning(
+        session,
+        ChatPrompts,
+        [
+            ChatPrompts.chat_id == chat_id,
+            ChatPrompts.prompt_id == prompt_id,
+            chat_owned_by(ChatPrompts.chat_id, current_user.id),
+        ],
+        not_found="Link not found",
+    )
+    await emit_changes(
+        session,
+        _link_event(chat_id, "prompts", prompt_id, "chat.link_deleted"),
     )
-    res = await session.execute(stmt_find)
-    obj = res.scalar_one_or_none()
-
-    if obj is None:
-        raise HTTPException(status_code=404, detail="Link not found")
-
-    await session.delete(obj)
     await session.commit()
+    policy_cache.pop(chat_id)
+    dashboard_cache.pop(current_user.id)
     return None
 
 
@@ -285,7 +468,18 @@ async def create_chat_custom_prompt_link(
         threshold=payload.threshold,
     )
     session.add(obj)
+    await emit_changes(
+        session,
+        _link_event(
+            chat_id,
+            "custom_prompts",
+            payload.custom_prompt_id,
+            "chat.link_created",
+        ),
+    )
     await session.commit()
+    policy_cache.pop(chat_id)
+    dashboard_cache.pop(current_user.id)
     await session.refresh(obj)
 
     return ChatCustomPromptLinkResponse.model_validate(obj)
@@ -301,18 +495,206 @@ async def delete_chat_custom_prompt_link(
     session: AsyncSession = Depends(get_session),
     current_user: Users = Depends(get_current_user),
 ) -> None:
+    await delete_returning(
+        session,
+        ChatCustomPrompts,
+        [
+            ChatCustomPrompts.chat_id == chat_id,
+            ChatCustomPrompts.custom_prompt_id == custom_prompt_id,
+            chat_owned_by(ChatCustomPrompts.chat_id, current_user.id),
+        ],
+        not_found="Link not found",
+    )
+    await emit_changes(
+        session,
+        _link_event(
+            chat_id,
+            "custom_prompts",
+            custom_prompt_id,
+            "chat.link_deleted",
+        ),
+    )
+    await session.commit()
+    policy_cache.pop(chat_id)
+    dashboard_cache.pop(current_user.id)
+    return None
+
+
+async def _replace_links(
+    session: AsyncSession,
+    chat_id: UUID,
+    link_model: type[ChatPrompts] | type[ChatCustomPrompts],
+    target_model: type[Prompts] | type[CustomPrompts],
+    target_fk: str,
+    constraint: str,
+    desired: list[tuple[UUID, Optional[int], float, bool]],
+    target_filter: list,
+) -> list:
+    """
+    Make the chat's links exactly `desired` in two statements:
+    an INSERT ... SELECT ... ON CONFLICT DO UPDATE RETURNING (joined to the
+    target table, so unknown/foreign prompts are dropped) and a DELETE of
+    every link not in the set. Raises 404 (caller rolls back) if any
+    desired prompt was not found.
+    """
+    links = []
+    if desired:
+        desired_rows = values(
+            column("id", Uuid),
+            column("target_id", Uuid),
+            column("priority", Integer),
+            column("threshold", Double),
+            column("is_active", Boolean),
+            name="desired",
+        ).data([(uuid.uuid4(), *row) for row in desired])
+
+        source = (
+            select(
+                desired_rows.c.id,
+                literal(chat_id, Uuid),
+                desired_rows.c.target_id,
+                desired_rows.c.priority,
+                desired_rows.c.threshold,
+                desired_rows.c.is_active,
+            )
+            .select_from(desired_rows)
+            .join(target_model, target_model.id == desired_rows.c.target_id)
+            .where(*target_filter)
+        )
+        stmt = pg_insert(link_model).from_select(
+            ["id", "chat_id", target_fk, "priority", "threshold", "is_active"],  # noqa: E501
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint=constraint,
+            set_={
+                "priority": stmt.excluded.priority,
+                "threshold": stmt.excluded.threshold,
+                "is_active": stmt.excluded.is_active,
+            },
+        ).returning(link_model)
+
+        res = await session.execute(
+            stmt,
+            execution_options={"populate_existing": True},
+        )
+        links = list(res.scalars().all())
+
+        found = {getattr(x, target_fk) for x in links}
+        missing = [str(row[0]) for row in desired if row[0] not in found]
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Prompts not found: {', '.join(missing)}",
+            )
+
+    target_column = getattr(link_model, target_fk)
+    await session.execute(
+        delete(link_model).where(
+            link_model.chat_id == chat_id,
+            target_column.not_in([row[0] for row in desired]),
+        )
+    )
+    return links
+
+
+def _links_replaced_event(chat_id: UUID, kind: str, count: int) -> ChangeEvent:  # noqa: E501
+    return ChangeEvent(
+        aggregate_type="chat",
+        aggregate_id=chat_id,
+        chat_id=chat_id,
+        event_type="chat.links_replaced",
+        payload={"kind": kind, "count": count},
+    )
+
+
+@router.put("/{chat_id}/prompts", response_model=ChatPromptLinksList)
+async def replace_chat_prompt_links(
+    chat_id: UUID,
+    payload: ChatPromptLinksReplace,
+    session: AsyncSession = Depends(get_session),
+    current_user: Users = Depends(get_current_user),
+) -> ChatPromptLinksList:
+    log.info(
+        f"Replacing prompt links of chat {chat_id} ({len(payload.links)} links) by user: {current_user.id}"  # noqa: E501
+    )
     await _get_my_chat_or_404(session, current_user, chat_id)
 
-    stmt_find = select(ChatCustomPrompts).where(
-        ChatCustomPrompts.chat_id == chat_id,
-        ChatCustomPrompts.custom_prompt_id == custom_prompt_id,
+    try:
+        links = await _replace_links(
+            session,
+            chat_id,
+            link_model=ChatPrompts,
+            target_model=Prompts,
+            target_fk="prompt_id",
+            constraint="uk_chat_prompts_chat_id_prompt_id",
+            desired=[
+                (x.prompt_id, x.priority, x.threshold, x.is_active)
+                for x in payload.links
+            ],
+            target_filter=[],
+        )
+    except HTTPException:
+        await session.rollback()
+        raise
+
+    await emit_changes(
+        session,
+        _links_replaced_event(chat_id, "prompts", len(links)),
     )
-    res = await session.execute(stmt_find)
-    obj = res.scalar_one_or_none()
+    await session.commit()
+    policy_cache.pop(chat_id)
+    dashboard_cache.pop(current_user.id)
 
-    if obj is None:
-        raise HTTPException(status_code=404, detail="Link not found")
+    return ChatPromptLinksList(
+        prompts=[ChatPromptLinkResponse.model_validate(x) for x in links]
+    )
 
-    await session.delete(obj)
+
+@router.put(
+    "/{chat_id}/custom-prompts",
+    response_model=ChatCustomPromptLinksList,
+)
+async def replace_chat_custom_prompt_links(
+    chat_id: UUID,
+    payload: ChatCustomPromptLinksReplace,
+    session: AsyncSession = Depends(get_session),
+    current_user: Users = Depends(get_current_user),
+) -> ChatCustomPromptLinksList:
+    log.info(
+        f"Replacing custom prompt links of chat {chat_id} ({len(payload.links)} links) by user: {current_user.id}"  # noqa: E501
+    )
+    await _get_my_chat_or_404(session, current_user, chat_id)
+
+    try:
+        links = await _replace_links(
+            session,
+            chat_id,
+            link_model=ChatCustomPrompts,
+            target_model=CustomPrompts,
+            target_fk="custom_prompt_id",
+            constraint="uk_chat_custom_prompts_chat_id_custom_prompt_id",
+            desired=[
+                (x.custom_prompt_id, x.priority, x.threshold, x.is_active)
+                for x in payload.links
+            ],
+            # custom prompts can only be linked by their owner
+            target_filter=[CustomPrompts.user_id == current_user.id],
+        )
+    except HTTPException:
+        await session.rollback()
+        raise
+
+    await emit_changes(
+        session,
+        _links_replaced_event(chat_id, "custom_prompts", len(links)),
+    )
     await session.commit()
-    return None
+    policy_cache.pop(chat_id)
+    dashboard_cache.pop(current_user.id)
+
+    return ChatCustomPromptLinksList(
+        custom_prompts=[
+            ChatCustomPromptLinkResponse.model_validate(x) for x in links
+        ]
+    )
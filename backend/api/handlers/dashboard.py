@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps.auth import get_current_user
+from cache import dashboard_cache
+from database import db_helper
+from database.models import (
+    ChatCounters,
+    ChatCustomPrompts,
+    ChatMemberCounts,
+    ChatPrompts,
+    Chats,
+    Users,
+)
+from database.schemas.dashboard import (
+    DashboardChatSummary,
+    DashboardSummary,
+    DashboardTotals,
+)
+from logger import get_logger
+
+
+log = get_logger(__name__)
+get_session = db_helper.session_getter
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+def _summary_stmt(user: Users):
+    """
+    One statement: per-chat rows plus the overall row via GROUPING SETS.
+    Link counts are pre-aggregated per chat so the joins never fan out.
+    """
+    my_chats = select(Chats.id).where(Chats.user_id == user.id)
+    links = union_all(
+        select(ChatPrompts.chat_id).where(
+            ChatPrompts.chat_id.in_(my_chats),
+            ChatPrompts.is_active == True,  # noqa: E712
+        ),
+        select(ChatCustomPrompts.chat_id).where(
+            ChatCustomPrompts.chat_id.in_(my_chats),
+            ChatCustomPrompts.is_active == True,  # noqa: E712
+        ),
+    ).subquery("links")
+    link_counts = (
+        select(links.c.chat_id, func.count().label("n"))
+        .group_by(links.c.chat_id)
+        .subquery("link_counts")
+    )
+
+    counters = ChatCounters.c
+    members = ChatMemberCounts.c
+
+    def total(col):
+        return func.coalesce(func.sum(col), 0)
+
+    per_chat = (Chats.id, Chats.title, Chats.type, Chats.platform_chat_id, Chats.is_active)  # noqa: E501
+    return (
+        select(
+            *per_chat,
+            func.grouping(Chats.id).label("is_total"),
+            func.count(Chats.id).label("chats"),
+            total(counters.processed_messages).label("processed_messages"),
+            total(counters.spam_detected).label("spam_detected"),
+            total(counters.messages_deleted).label("messages_deleted"),
+            total(members.trusted_count).label("trusted_members"),
+            total(members.untrusted_count).label("untrusted_members"),
+            total(link_counts.c.n).label("active_prompt_links"),
+        )
+        .select_from(Chats)
+        .outerjoin(ChatCounters, counters.chat_id == Chats.id)
+        .outerjoin(ChatMemberCounts, members.chat_id == Chats.id)
+        .outerjoin(link_counts, link_counts.c.chat_id == Chats.id)
+        .where(Chats.user_id == user.id)
+        .group_by(func.grouping_sets(tuple_(*per_chat, Chats.created_at), tuple_()))  # noqa: E501
+        .order_by(func.grouping(Chats.id), Chats.created_at.desc())
+    )
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def get_dashboard_summary(
+    session: AsyncSession = Depends(get_session),
+    current_user: Users = Depends(get_current_user),
+) -> DashboardSummary:
+    cached = dashboard_cache.get(current_user.id)
+    if cached is not None:
+        return cached
+
+    res = await session.execute(_summary_stmt(current_user))
+
+    chats = []
+    totals = None
+    for row in res.mappings().all():
+        if row["is_total"]:
+            totals = DashboardTotals.model_validate(row)
+        else:
+            chats.append(
+                DashboardChatSummary.model_validate(
+                    {**row, "chat_id": row["id"]}
+                )
+            )
+
+    summary = DashboardSummary(
+        # the grand-total row is always present, even with no chats
+        totals=totals,
+        chats=chats,
+    )
+    dashboard_cache.set(current_user.id, summary)
+    return summary
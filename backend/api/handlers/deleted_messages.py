@@ -1,16 +1,26 @@
+import base64
+import heapq
+import itertools
 import json
+import math
+import re
+from datetime import datetime, timezone
+from typing import Optional
 from uuid import UUID
 
-import redis.asyncio as redis
+import orjson
 from fastapi import Depends, HTTPException, Query, APIRouter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import ValidationError
 
+from api.deps import ConditionalGet
 from api.deps.auth import get_current_user
+from cache import redis_helper, RedisUnavailable
 from database import db_helper
 from database.models import Chats, Users
 from database.schemas.deleted_messages import (
+    DeletedMessagesFeed,
     DeletedMessagesList,
     DeletedMessageResponse,
 )
@@ -20,40 +30,111 @@ log = get_logger(__name__)
 get_session = db_helper.session_getter
 
 
-def get_redis():
-    # TODO: Move URL to env
-    return redis.from_url("redis://redis:6379", decode_responses=True)
+router = APIRouter(prefix="/deleted-messages", tags=["deleted_messages"])
 
+STREAM_ID_RE = re.compile(r"^\d+(-\d+)?$")
 
-router = APIRouter(prefix="/deleted-messages", tags=["deleted_messages"])
+# Cursor entry holding the inclusive floor of the last returned page
+FEED_FLOOR_KEY = "*"
 
 
-@router.get("/{chat_id}", response_model=DeletedMessagesList)
-async def get_deleted_messages(
-    chat_id: UUID,
-    session: AsyncSession = Depends(get_session),
-    current_user: Users = Depends(get_current_user),
-    r=Depends(get_redis),
-    limit: int = Query(50, ge=1, le=200),
-) -> DeletedMessagesList:
-    stmt = select(Chats).where(
-        Chats.id == chat_id, Chats.user_id == current_user.id
-    )
-    res = await session.execute(stmt)
-    chat = res.scalar_one_or_none()
-    if chat is None:
-        raise HTTPException(status_code=404, detail="Chat not found")
+def _stream_key(chat_id: UUID) -> str:
+    return f"deleted_messages:{chat_id}"
+
+
+def _stream_id(value: Optional[str], name: str) -> Optional[str]:
+    if value is not None and not STREAM_ID_RE.match(value):
+        raise HTTPException(status_code=400, detail=f"Invalid `{name}` stream id")  # noqa: E501
+    return value
+
+
+def _ms(value: datetime) -> int:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _id_key(stream_id: str) -> tuple[int, int]:
+    ms, _, seq = stream_id.partition("-")
+    return int(ms), int(seq or 0)
+
 
-    stream_key = f"deleted_messages:{chat_id}"
+def _stream_range(
+    before: Optional[str],
+    after: Optional[str],
+    since: Optional[datetime],
+    until: Optional[datetime],
+) -> tuple[str, str]:
+    """
+    (min, max) for XRANGE/XREVRANGE. Stream ids start with the insertion
+    time in ms, so timestamps map onto id ranges; a bare `<ms>` bound
+    covers every sequence number of that millisecond. Cursors are
+    exclusive ("(" prefix, Redis >= 6.2).
+    """
+    lo = "-"
+    hi = "+"
+    if since is not None:
+        lo = str(_ms(since))
+    if until is not None:
+        hi = str(_ms(until))
 
+    # the tighter of cursor and timestamp bound wins; Redis returns an
+    # empty range when min > max
+    if after is not None and (lo == "-" or _id_key(after) >= _id_key(lo)):
+        lo = f"({after}"
+    if before is not None and (
+        hi == "+" or _id_key(before) <= (int(hi), math.inf)
+    ):
+        hi = f"({before}"
+    return lo, hi
+
+
+def _encode_feed_cursor(positions: dict[str, str]) -> str:
+    raw = orjson.dumps(positions)
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _decode_feed_cursor(cursor: str) -> dict[str, str]:
+    """
+    {chat_id: XREVRANGE max bound}: `(<id>` after the chat's last returned
+    entry, `<id>` (inclusive) for a chat that had nothing in the page, or
+    empty for an exhausted stream. `FEED_FLOOR_KEY` holds the previous
+    page's floor. Malformed cursors are a 400.
+    """
     try:
-        rows = await r.xrevrange(stream_key, max="+", min="-", count=limit)
+        padded = cursor + "=" * (-len(cursor) % 4)
+        positions = orjson.loads(base64.urlsafe_b64decode(padded))
+        if not isinstance(positions, dict) or not all(
+            isinstance(v, str)
+            and (v == "" or STREAM_ID_RE.match(v.removeprefix("(")))
+            for v in positions.values()
+        ):
+            raise ValueError
+        return positions
     except Exception:
-        log.exception("Redis read failed")
-        raise HTTPException(status_code=502, detail="Redis error")
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _feed_default_bound(positions: dict[str, str]) -> str:
+    """Where a chat missing from the cursor (e.g. added since) starts."""
+    if not positions:
+        return "+"
+    if positions.get(FEED_FLOOR_KEY):
+        return positions[FEED_FLOOR_KEY]
+    # cursors without a stored floor: the lowest position is at or below it
+    bounds = [v for v in positions.values() if v]
+    return min(bounds, key=_bound_key) if bounds else "+"
+
+
+def _bound_key(bound: str) -> tuple[int, int, int]:
+    """Orders max bounds: `(<id>` sorts just below `<id>`."""
+    exclusive = bound.startswith("(")
+    return (*_id_key(bound.removeprefix("(")), 0 if exclusive else 1)
 
+
+def _parse_entries(rows) -> list[DeletedMessageResponse]:
     items: list[DeletedMessageResponse] = []
-    for _entry_id, fields in rows:
+    for entry_id, fields in rows:
         payload = fields.get("payload")
         if not payload:
             continue
@@ -68,11 +149,167 @@ async def get_deleted_messages(
             if "user_state_id" not in obj and "user_state_uuid" in obj:
                 obj["user_state_id"] = obj.pop("user_state_uuid")
 
+            obj["stream_id"] = entry_id
             items.append(DeletedMessageResponse(**obj))
 
         except (json.JSONDecodeError, ValidationError) as e:
             log.warning(
-                f"Failed to parse deleted message payload entry={_entry_id}: {e}"  # noqa: E501
+                f"Failed to parse deleted message payload entry={entry_id}: {e}"  # noqa: E501
             )
+    return items
+
 
-    return DeletedMessagesList(items=items)
+@router.get("/{chat_id}", response_model=DeletedMessagesList)
+async def get_deleted_messages(
+    chat_id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: Users = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    before: Optional[str] = Query(None, description="Older than this stream id"),  # noqa: E501
+    after: Optional[str] = Query(
+        None,
+        description="Newer than this stream id (e.g. last seen); oldest first",  # noqa: E501
+    ),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    conditional: ConditionalGet = Depends(),
+) -> DeletedMessagesList:
+    before = _stream_id(before, "before")
+    after = _stream_id(after, "after")
+
+    stmt = select(Chats.id).where(
+        Chats.id == chat_id, Chats.user_id == current_user.id
+    )
+    res = await session.execute(stmt)
+    if res.scalar_one_or_none() is None:
+        raise HTTPException(status_code=404, detail="Chat not found")
+
+    stream_key = _stream_key(chat_id)
+    lo, hi = _stream_range(before, after, since, until)
+
+    try:
+        async with redis_helper.guard() as r:
+            # Probe: newest entry id + length changes whenever the page does
+            async with r.pipeline(transaction=False) as pipe:
+                pipe.xrevrange(stream_key, max="+", min="-", count=1)
+                pipe.xlen(stream_key)
+                newest, length = await pipe.execute()
+            conditional.check(newest[0][0] if newest else None, length)
+
+            # `after` is the polling mode: walk forward from the last seen
+            # id so only the delta is transferred
+            if after is not None:
+                rows = await r.xrange(stream_key, min=lo, max=hi, count=limit)  # noqa: E501
+            else:
+                rows = await r.xrevrange(stream_key, max=hi, min=lo, count=limit)  # noqa: E501
+    except RedisUnavailable:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Redis read failed")
+        raise HTTPException(status_code=502, detail="Redis error")
+
+    next_cursor = rows[-1][0] if len(rows) == limit else None
+    if rows:
+        last_id = rows[-1][0] if after is not None else rows[0][0]
+    else:
+        last_id = after
+
+    return DeletedMessagesList(
+        items=_parse_entries(rows),
+        next_cursor=next_cursor,
+        last_id=last_id,
+    )
+
+
+@router.get("", response_model=DeletedMessagesFeed)
+async def get_deleted_messages_feed(
+    session: AsyncSession = Depends(get_session),
+    current_user: Users = Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None),
+    conditional: ConditionalGet = Depends(),
+) -> DeletedMessagesFeed:
+    """
+    Deleted messages of all the caller's chats, newest first. Every stream
+    is read in one pipeline and the per-chat pages are k-way merged by
+    stream id, so one request replaces a call per chat.
+    """
+    positions = _decode_feed_cursor(cursor) if cursor is not None else {}
+
+    res = await session.execute(
+        select(Chats.id).where(Chats.user_id == current_user.id)
+    )
+    chat_ids = [
+        str(x) for x in res.scalars().all()
+        # exhausted streams are not read again
+        if positions.get(str(x)) != ""
+    ]
+    if not chat_ids:
+        return DeletedMessagesFeed(items=[])
+
+    # Chats without a position must not restart from "+": their newer
+    # entries would follow older entries of other chats
+    default_bound = _feed_default_bound(positions)
+
+    try:
+        async with redis_helper.guard() as r:
+            # A single chat can fill at most `limit` slots of the page
+            async with r.pipeline(transaction=False) as pipe:
+                for chat_id in chat_ids:
+                    pipe.xrevrange(
+                        _stream_key(chat_id),
+                        max=positions.get(chat_id) or default_bound,
+                        min="-",
+                        count=limit,
+                    )
+                results = await pipe.execute()
+    except RedisUnavailable:
+        raise HTTPException(status_code=503, detail="Redis unavailable")
+    except Exception:
+        log.exception("Redis read failed")
+        raise HTTPException(status_code=502, detail="Redis error")
+
+    # Each stream page is already newest first; the heap merge pulls only
+    # as many entries as the page needs
+    merged = heapq.merge(
+        *[
+            [(chat_id, entry_id, fields) for entry_id, fields in rows]
+            for chat_id, rows in zip(chat_ids, results)
+        ],
+        key=lambda x: _id_key(x[1]),
+        reverse=True,
+    )
+    page = list(itertools.islice(merged, limit))
+
+    taken: dict[str, int] = {}
+    for chat_id, entry_id, _fields in page:
+        positions[chat_id] = f"({entry_id}"
+        taken[chat_id] = taken.get(chat_id, 0) + 1
+
+    # Chats with nothing in the page continue from the page's floor, so an
+    # entry added to them meanwhile cannot surface after older entries of
+    # other chats. Inclusive: an equal id in another stream is not skipped.
+    floor = page[-1][1] if page else None
+    if floor is not None:
+        positions[FEED_FLOOR_KEY] = floor
+
+    exhausted = True
+    for chat_id, rows in zip(chat_ids, results):
+        if len(rows) < limit and taken.get(chat_id, 0) == len(rows):
+            positions[chat_id] = ""
+            continue
+
+        exhausted = False
+        if chat_id not in taken and floor is not None:
+            current = positions.get(chat_id)
+            if current is None or _bound_key(floor) < _bound_key(current):
+                positions[chat_id] = floor
+
+    conditional.check(current_user.id, *[x[1] for x in page])
+
+    return DeletedMessagesFeed(
+        items=_parse_entries([(entry_id, fields) for _c, entry_id, fields in page]),  # noqa: E501
+        next_cursor=None if exhausted else _encode_feed_cursor(positions),
+    )
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+
+from api.hashing import password_hasher
+from api.login_governor import login_governor
+from api.security import token_cache_stats
+from cache import redis_helper, user_cache
+from database.auto_trust import auto_trust_sweeper
+from database.outbox import outbox_relay
+from database.runtime_stats import runtime_counters
+from database.stats_rollup import stats_rollup
+
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/health")
+async def health() -> dict:
+    return {
+        "status": "ok",
+        "redis": redis_helper.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache_stats(),
+        "password_hashing": password_hasher.stats(),
+        "login_governor": login_governor.stats(),
+        "outbox_relay": outbox_relay.stats(),
+        "stats_rollup": stats_rollup.stats(),
+        "runtime_counters": runtime_counters.stats(),
+        "auto_trust": auto_trust_sweeper.stats(),
+    }
@@ -0,0 +1,173 @@
+import hashlib
+from typing import Optional
+from uuid import UUID
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy import String, func, literal, select, true, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps.auth import get_current_user
+from api.deps.etag import etag_matches
+from cache import CompiledPolicy, policy_cache
+from database import db_helper
+from database.models import (
+    ChatCustomPrompts,
+    ChatPrompts,
+    Chats,
+    CustomPrompts,
+    Prompts,
+    Users,
+)
+from database.schemas.chat import ChatSettingsResponse
+from database.schemas.policy import ChatPolicyBundle, PolicyPrompt
+from logger import get_logger
+
+
+log = get_logger(__name__)
+get_session = db_helper.session_getter
+
+router = APIRouter(prefix="/chats", tags=["policy"])
+
+
+def _links_subquery(chat_id: UUID):
+    prompts = (
+        select(
+            literal("prompt", String).label("kind"),
+            ChatPrompts.id.label("link_id"),
+            Prompts.id.label("prompt_id"),
+            ChatPrompts.priority.label("priority"),
+            ChatPrompts.threshold.label("threshold"),
+            Prompts.prompt_text.label("text"),
+            func.greatest(ChatPrompts.updated_at, Prompts.updated_at).label(
+                "updated_at"
+            ),
+        )
+        .join(Prompts, Prompts.id == ChatPrompts.prompt_id)
+        .where(
+            ChatPrompts.chat_id == chat_id,
+            ChatPrompts.is_active == True,  # noqa: E712
+            Prompts.is_active == True,  # noqa: E712
+        )
+    )
+    custom_prompts = (
+        select(
+            literal("custom_prompt", String).label("kind"),
+            ChatCustomPrompts.id.label("link_id"),
+            CustomPrompts.id.label("prompt_id"),
+            ChatCustomPrompts.priority.label("priority"),
+            ChatCustomPrompts.threshold.label("threshold"),
+            CustomPrompts.prompt_text.label("text"),
+            func.greatest(
+                ChatCustomPrompts.updated_at,
+                CustomPrompts.updated_at,
+            ).label("updated_at"),
+        )
+        .join(
+            CustomPrompts,
+            CustomPrompts.id == ChatCustomPrompts.custom_prompt_id,
+        )
+        .where(
+            ChatCustomPrompts.chat_id == chat_id,
+            ChatCustomPrompts.is_active == True,  # noqa: E712
+            CustomPrompts.is_active == True,  # noqa: E712
+        )
+    )
+    return union_all(prompts, custom_prompts).subquery("links")
+
+
+async def _compile_policy(
+    session: AsyncSession,
+    chat_id: UUID,
+    user_id: UUID,
+) -> Optional[CompiledPolicy]:
+    links = _links_subquery(chat_id)
+    stmt = (
+        select(
+            Chats,
+            links.c.kind,
+            links.c.link_id,
+            links.c.prompt_id,
+            links.c.priority,
+            links.c.threshold,
+            links.c.text,
+            links.c.updated_at,
+        )
+        .outerjoin(links, true())
+        .where(Chats.id == chat_id, Chats.user_id == user_id)
+        .order_by(
+            links.c.priority.asc().nulls_last(),
+            links.c.kind,
+            links.c.link_id,
+        )
+    )
+    rows = (await session.execute(stmt)).all()
+    if not rows:
+        return None
+
+    chat = rows[0][0]
+    version = chat.updated_at
+    prompts: list[PolicyPrompt] = []
+    for _, kind, link_id, prompt_id, priority, threshold, text, updated_at in rows:  # noqa: E501
+        if link_id is None or not text:
+            continue
+        version = max(version, updated_at)
+        prompts.append(
+            PolicyPrompt(
+                kind=kind,
+                link_id=link_id,
+                prompt_id=prompt_id,
+                priority=priority,
+                threshold=threshold,
+                text=text,
+            )
+        )
+
+    # max(updated_at) alone misses deleted/deactivated links -> add identity
+    digest = hashlib.sha256(
+        "|".join(
+            [version.isoformat()] + [str(p.link_id) for p in prompts]
+        ).encode()
+    ).hexdigest()[:32]
+
+    bundle = ChatPolicyBundle(
+        version=version.isoformat(),
+        chat=ChatSettingsResponse.model_validate(chat),
+        prompts=prompts,
+    )
+    return CompiledPolicy(
+        owner_id=chat.user_id,
+        etag=f'"{digest}"',
+        body=orjson.dumps(bundle.model_dump(mode="json")),
+    )
+
+
+def _policy_response(compiled: CompiledPolicy) -> Response:
+    return Response(
+        content=compiled.body,
+        media_type="application/json",
+        headers={"ETag": compiled.etag, "Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/{chat_id}/policy", response_model=ChatPolicyBundle)
+async def get_chat_policy(
+    chat_id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: Users = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    compiled = policy_cache.get(chat_id)
+    if compiled is None or compiled.owner_id != current_user.id:
+        compiled = await _compile_policy(session, chat_id, current_user.id)
+        if compiled is None:
+            raise HTTPException(status_code=404, detail="Chat not found")
+        policy_cache.set(chat_id, compiled)
+        log.debug(f"Compiled policy bundle for chat {chat_id}")
+
+    if etag_matches(if_none_match, compiled.etag):
+        return Response(
+            status_code=304,
+            headers={"ETag": compiled.etag, "Cache-Control": "no-cache"},
+        )
+    return _policy_response(compiled)
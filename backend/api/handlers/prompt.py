@@ -2,13 +2,16 @@ from typing import Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.deps import Ordering
+from api.deps import ConditionalGet, Keyset, Ordering
 from api.deps.auth import get_current_user
+from cache import dashboard_cache, policy_cache
 from database import db_helper
-from database.models import CustomPrompts, Prompts, Users
+from database.outbox import ChangeEvent, emit_changes
+from database.writes import delete_returning, update_returning
+from database.models import ChatCustomPrompts, CustomPrompts, Prompts, Users
 from database.schemas import (
     CustomPromptCreate,
     CustomPromptResponse,
@@ -43,6 +46,38 @@ custom_prompts_ordering = Ordering(
     default_field="id",
 )
 
+# Default order (no `order` param) is keyset-paginated by (created_at, id)
+prompts_keyset = Keyset(model=Prompts, field="created_at")
+prompts_keyset_desc = Keyset(model=Prompts, field="created_at", descending=True)  # noqa: E501
+custom_prompts_keyset = Keyset(model=CustomPrompts, field="created_at")
+custom_prompts_keyset_desc = Keyset(
+    model=CustomPrompts,
+    field="created_at",
+    descending=True,
+)
+
+
+def _custom_prompt_events(
+    chat_ids: list[UUID],
+    custom_prompt_id: UUID,
+    event_type: str,
+) -> list[ChangeEvent]:
+    """One event per chat whose moderation policy uses the custom prompt."""
+    return [
+        ChangeEvent(
+            aggregate_type="chat",
+            aggregate_id=chat_id,
+            chat_id=chat_id,
+            event_type=event_type,
+            payload={
+                "kind": "custom_prompts",
+                "target_id": str(custom_prompt_id),
+            },
+        )
+        for chat_id in chat_ids
+    ]
+
+
 # -------------------- Prompts (read-only list) --------------------
 
 
@@ -51,36 +86,53 @@ async def list_prompts(
     session: AsyncSession = Depends(get_session),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     order: Optional[str] = Query(None),
     order_desc: bool = Query(False),
+    conditional: ConditionalGet = Depends(),
 ) -> PromptsList:
     log.debug(
         f"Listing prompts, limit: {limit}, offset: {offset}, is_active: {is_active}, order: {order}, order_desc: {order_desc}"  # noqa: E501
     )
     stmt = select(Prompts)
+    probe = select(func.max(Prompts.updated_at), func.count()).select_from(
+        Prompts
+    )
 
     if is_active is not None:
         stmt = stmt.where(Prompts.is_active == is_active)
+        probe = probe.where(Prompts.is_active == is_active)
         log.debug(f"Filtering by is_active: {is_active}")
 
-    stmt = (
-        stmt.order_by(
-            prompts_ordering.order_by(
-                order=order,
-                order_desc=order_desc,
+    await conditional.check_probe(session, probe)
+
+    next_cursor = None
+    if order is None:
+        keyset = prompts_keyset_desc if order_desc else prompts_keyset
+        stmt = keyset.apply(stmt, cursor, limit)
+        if cursor is None:
+            stmt = stmt.offset(offset)
+        res = await session.execute(stmt)
+        items, next_cursor = keyset.page(res.scalars().all(), limit)
+    else:
+        stmt = (
+            stmt.order_by(
+                prompts_ordering.order_by(
+                    order=order,
+                    order_desc=order_desc,
+                )
             )
+            .offset(offset)
+            .limit(limit)
         )
-        .offset(offset)
-        .limit(limit)
-    )
-
-    res = await session.execute(stmt)
-    items = res.scalars().all()
+        res = await session.execute(stmt)
+        items = res.scalars().all()
 
     log.info(f"Found {len(items)} prompts")
     return PromptsList(
-        prompts=[PromptResponse.model_validate(x) for x in items]
+        prompts=[PromptResponse.model_validate(x) for x in items],
+        next_cursor=next_cursor,
     )
 
 
@@ -94,36 +146,56 @@ async def list_custom_prompts(
     session: AsyncSession = Depends(get_session),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     is_active: Optional[bool] = Query(None),
     order: Optional[str] = Query(None),
     order_desc: bool = Query(False),
+    conditional: ConditionalGet = Depends(),
 ) -> CustomPromptsList:
     log.debug(
         f"Listing custom prompts for user: {current_user.id}, limit: {limit}, offset: {offset}, is_active: {is_active}, order: {order}, order_desc: {order_desc}"  # noqa: E501
     )
     stmt = select(CustomPrompts).where(CustomPrompts.user_id == current_user.id)  # noqa: E501
+    probe = select(
+        func.max(CustomPrompts.updated_at),
+        func.count(),
+    ).where(CustomPrompts.user_id == current_user.id)
 
     if is_active is not None:
         stmt = stmt.where(CustomPrompts.is_active == is_active)
+        probe = probe.where(CustomPrompts.is_active == is_active)
         log.debug(f"Filtering by is_active: {is_active}")
 
-    stmt = (
-        stmt.order_by(
-            custom_prompts_ordering.order_by(
-                order=order,
-                order_desc=order_desc,
+    await conditional.check_probe(session, probe, scope=current_user.id)
+
+    next_cursor = None
+    if order is None:
+        keyset = (
+            custom_prompts_keyset_desc if order_desc else custom_prompts_keyset
+        )
+        stmt = keyset.apply(stmt, cursor, limit)
+        if cursor is None:
+            stmt = stmt.offset(offset)
+        res = await session.execute(stmt)
+        items, next_cursor = keyset.page(res.scalars().all(), limit)
+    else:
+        stmt = (
+            stmt.order_by(
+                custom_prompts_ordering.order_by(
+                    order=order,
+                    order_desc=order_desc,
+                )
             )
+            .offset(offset)
+            .limit(limit)
         )
-        .offset(offset)
-        .limit(limit)
-    )
-
-    res = await session.execute(stmt)
-    items = res.scalars().all()
+        res = await session.execute(stmt)
+        items = res.scalars().all()
 
     log.info(f"Found {len(items)} custom prompts for user: {current_user.id}")
     return CustomPromptsList(
-        prompts=[CustomPromptResponse.model_validate(x) for x in items]
+        prompts=[CustomPromptResponse.model_validate(x) for x in items],
+        next_cursor=next_cursor,
     )
 
 
@@ -132,6 +204,7 @@ async def get_custom_prompt(
     custom_prompt_id: UUID,
     current_user: Users = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
+    conditional: ConditionalGet = Depends(),
 ) -> CustomPromptResponse:
     log.debug(
         f"Retrieving custom prompt {custom_prompt_id} for user: {current_user.id}"  # noqa: E501
@@ -149,6 +222,8 @@ async def get_custom_prompt(
         )
         raise HTTPException(status_code=404, detail="Custom prompt not found")
 
+    conditional.check_detail(obj)
+
     log.info(
         f"Successfully retrieved custom prompt {custom_prompt_id} for user: {current_user.id}"  # noqa: E501
     )
@@ -196,36 +271,46 @@ async def update_custom_prompt(
     log.info(
         f"Updating custom prompt {custom_prompt_id} for user: {current_user.id}"  # noqa: E501
     )
-    stmt = select(CustomPrompts).where(
-        CustomPrompts.id == custom_prompt_id,
-        CustomPrompts.user_id == current_user.id,
-    )
-    res = await session.execute(stmt)
-    obj = res.scalar_one_or_none()
-
-    if obj is None:
-        log.warning(
-            f"Custom prompt {custom_prompt_id} not found for user: {current_user.id}"  # noqa: E501
-        )
-        raise HTTPException(status_code=404, detail="Custom prompt not found")
-
     data = payload.model_dump(exclude_unset=True)
     log.debug(f"Updating custom prompt {custom_prompt_id} with data: {data}")
 
     if "title" in data:
-        obj.name = data.pop("title")
+        data["name"] = data.pop("title")
 
     if "text" in data:
-        obj.prompt_text = data.pop("text")
-
-    for k, v in data.items():
-        setattr(obj, k, v)
+        data["prompt_text"] = data.pop("text")
+
+    obj = await update_returning(
+        session,
+        CustomPrompts,
+        [
+            CustomPrompts.id == custom_prompt_id,
+            CustomPrompts.user_id == current_user.id,
+        ],
+        data,
+        CustomPromptResponse,
+        not_found="Custom prompt not found",
+    )
 
+    res = await session.execute(
+        select(ChatCustomPrompts.chat_id).where(
+            ChatCustomPrompts.custom_prompt_id == custom_prompt_id
+        )
+    )
+    await emit_changes(
+        session,
+        *_custom_prompt_events(
+            list(res.scalars().all()),
+            custom_prompt_id,
+            "chat.custom_prompt_updated",
+        ),
+    )
     await session.commit()
-    await session.refresh(obj)
+    # linked chats are not tracked per process - drop all compiled bundles
+    policy_cache.clear()
 
     log.info(f"Successfully updated custom prompt {custom_prompt_id}")
-    return CustomPromptResponse.model_validate(obj)
+    return obj
 
 
 @router.delete(
@@ -240,21 +325,35 @@ async def delete_custom_prompt(
     log.info(
         f"Deleting custom prompt {custom_prompt_id} for user: {current_user.id}"  # noqa: E501
     )
-    stmt = select(CustomPrompts).where(
+    owned = [
         CustomPrompts.id == custom_prompt_id,
         CustomPrompts.user_id == current_user.id,
-    )
-    res = await session.execute(stmt)
-    obj = res.scalar_one_or_none()
-
-    if obj is None:
-        log.warning(
-            f"Custom prompt {custom_prompt_id} not found for user: {current_user.id}"  # noqa: E501
+    ]
+    # the links' FK cascade lives in Django, not in the database
+    res = await session.execute(
+        delete(ChatCustomPrompts)
+        .where(
+            ChatCustomPrompts.custom_prompt_id.in_(
+                select(CustomPrompts.id).where(*owned)
+            )
         )
-        raise HTTPException(status_code=404, detail="Custom prompt not found")
-
-    await session.delete(obj)
+        .returning(ChatCustomPrompts.chat_id)
+    )
+    chat_ids = list(res.scalars().all())
+    await delete_returning(
+        session,
+        CustomPrompts,
+        owned,
+        not_found="Custom prompt not found",
+    )
+    await emit_changes(
+        session,
+        *_custom_prompt_events(chat_ids, custom_prompt_id, "chat.link_deleted"),  # noqa: E501
+    )
     await session.commit()
+    # linked chats are not tracked per process - drop all compiled bundles
+    policy_cache.clear()
+    dashboard_cache.pop(current_user.id)
 
     log.info(f"Successfully deleted custom prompt {custom_prompt_id}")
     return None
@@ -268,6 +367,7 @@ async def delete_custom_prompt(
 async def get_prompt(
     prompt_id: UUID,
     session: AsyncSession = Depends(get_session),
+    conditional: ConditionalGet = Depends(),
 ) -> PromptResponse:
     log.debug(f"Retrieving prompt {prompt_id}")
     stmt = select(Prompts).where(Prompts.id == prompt_id)
@@ -278,5 +378,7 @@ async def get_prompt(
         log.warning(f"Prompt {prompt_id} not found")
         raise HTTPException(status_code=404, detail="Prompt not found")
 
+    conditional.check_detail(obj)
+
     log.info(f"Successfully retrieved prompt {prompt_id}")
     return PromptResponse.model_validate(obj)
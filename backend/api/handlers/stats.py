@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps.auth import get_current_user
+from database import db_helper
+from database.models import ChatCounters, Chats, ChatStatsBuckets, Users
+from database.runtime_stats import runtime_counters
+from database.schemas.stats import (
+    ChatCounterTotals,
+    ChatStatsPoint,
+    ChatStatsSeries,
+    RuntimeStatsEntry,
+    RuntimeStatsList,
+    StatsStep,
+)
+from logger import get_logger
+from settings import settings
+
+log = get_logger(__name__)
+
+get_session = db_helper.session_getter
+router = APIRouter(prefix="/chats", tags=["stats"])
+runtime_router = APIRouter(prefix="/runtime-stats", tags=["stats"])
+
+
+@router.get("/{chat_id}/stats", response_model=ChatStatsSeries)
+async def get_chat_stats(
+    chat_id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user: Users = Depends(get_current_user),
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    step: StatsStep = Query(StatsStep.HOUR),
+) -> ChatStatsSeries:
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=1)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+
+    if start >= end:
+        raise HTTPException(status_code=400, detail="`from` must be before `to`")  # noqa: E501
+    if (end - start) / step.delta > settings.STATS_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too large for step={step.value}; max {settings.STATS_MAX_POINTS} points",  # noqa: E501
+        )
+
+    # Ownership check and lifetime totals in one query
+    counters = ChatCounters.c
+    owned = await session.execute(
+        select(
+            Chats.id,
+            *[
+                func.coalesce(counters[f], 0).label(f)
+                for f in ChatCounterTotals.model_fields
+            ],
+        )
+        .outerjoin(ChatCounters, counters.chat_id == Chats.id)
+        .where(
+            Chats.id == chat_id,
+            Chats.user_id == current_user.id,
+        )
+    )
+    chat = owned.one_or_none()
+    if chat is None:
+        raise HTTPException(status_code=404, detail="Chat not found")
+    totals = ChatCounterTotals.model_validate(chat._mapping)
+
+    # Every instant lives in exactly one granularity (the rollup moves rows
+    # rather than copying them), so summing across granularities is exact.
+    t = ChatStatsBuckets.c
+    ts = func.date_trunc(literal_column(f"'{step.value}'"), t.bucket_start)
+    stmt = (
+        select(
+            ts.label("ts"),
+            func.sum(t.processed_messages).label("processed_messages"),
+            func.sum(t.spam_detected).label("spam_detected"),
+            func.sum(t.messages_deleted).label("messages_deleted"),
+        )
+        .where(
+            t.chat_id == chat_id,
+            t.granularity.in_([s.value for s in StatsStep]),
+            t.bucket_start >= start,
+            t.bucket_start < end,
+        )
+        .group_by(ts)
+        .order_by(ts)
+    )
+    res = await session.execute(stmt)
+
+    return ChatStatsSeries(
+        chat_id=chat_id,
+        totals=totals,
+        step=step,
+        start=start,
+        end=end,
+        items=[ChatStatsPoint.model_validate(x._mapping) for x in res.all()],
+    )
+
+
+@runtime_router.get("", response_model=RuntimeStatsList)
+async def get_runtime_stats(
+    current_user: Users = Depends(get_current_user),
+) -> RuntimeStatsList:
+    values, pending_included = await runtime_counters.read()
+    return RuntimeStatsList(
+        items=[
+            RuntimeStatsEntry(name=name, **counts)
+            for name, counts in sorted(values.items())
+        ],
+        pending_included=pending_included,
+    )
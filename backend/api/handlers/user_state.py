@@ -1,14 +1,37 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import func, select
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import (
+    BigInteger,
+    Select,
+    Uuid,
+    any_,
+    bindparam,
+    func,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.deps import ConditionalGet, Keyset
 from api.deps.auth import get_current_user
+from cache import dashboard_cache
 from database import db_helper
-from database.models import Chats, UserStates
+from database.outbox import ChangeEvent, emit_changes
+from database.writes import chat_owned_by, update_returning, upsert_user_state
+from database.models import ChatMemberCounts, Chats, UserStates
 from database.schemas.user_state import (
+    CountStrategy,
+    UserStateBulkAction,
+    UserStateBulkItem,
+    UserStateEnsure,
+    UserStatesBulkResponse,
+    UserStatesBulkUpdate,
     UserStateResponse,
     UserStatesList,
     UserStateUpdate,
@@ -21,6 +44,22 @@ get_session = db_helper.session_getter
 router = APIRouter(prefix="/chats", tags=["user_states"])
 
 
+def _user_state_event(obj: UserStateResponse, event_type: str) -> ChangeEvent:
+    return ChangeEvent(
+        aggregate_type="user_state",
+        aggregate_id=obj.id,
+        chat_id=obj.chat_id,
+        event_type=event_type,
+        payload={
+            "external_user_id": obj.external_user_id,
+            "trusted": obj.trusted,
+        },
+    )
+
+
+user_states_keyset = Keyset(model=UserStates, field="updated_at", descending=True)  # noqa: E501
+
+
 async def _ensure_chat_owned(
     session: AsyncSession,
     chat_id: UUID,
@@ -35,6 +74,59 @@ async def _ensure_chat_owned(
         raise HTTPException(status_code=404, detail="Chat not found")
 
 
+async def _estimate_rows(session: AsyncSession, stmt: Select) -> int:
+    compiled = stmt.compile(
+        dialect=session.bind.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    res = await session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    plan = res.scalar_one()
+    if isinstance(plan, str):
+        plan = orjson.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def _count_user_states(
+    session: AsyncSession,
+    chat_id: UUID,
+    trusted: Optional[bool],
+    external_user_id: Optional[int],
+    strategy: CountStrategy,
+) -> tuple[int, bool]:
+    """Returns (total, total_is_estimate)."""
+    # A single member lookup is an index probe - always count it exactly
+    if external_user_id is not None:
+        strategy = CountStrategy.EXACT
+
+    if strategy == CountStrategy.COUNTER:
+        if trusted is None:
+            column = (
+                ChatMemberCounts.c.trusted_count
+                + ChatMemberCounts.c.untrusted_count
+            )
+        elif trusted:
+            column = ChatMemberCounts.c.trusted_count
+        else:
+            column = ChatMemberCounts.c.untrusted_count
+
+        res = await session.execute(
+            select(column).where(ChatMemberCounts.c.chat_id == chat_id)
+        )
+        return res.scalar_one_or_none() or 0, False
+
+    stmt = select(UserStates.id).where(UserStates.chat_id == chat_id)
+    if trusted is not None:
+        stmt = stmt.where(UserStates.trusted == trusted)
+    if external_user_id is not None:
+        stmt = stmt.where(UserStates.external_user_id == external_user_id)
+
+    if strategy == CountStrategy.ESTIMATE:
+        return await _estimate_rows(session, stmt), True
+
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+    return (await session.execute(count_stmt)).scalar_one(), False
+
+
 @router.get("/{chat_id}/user-states", response_model=UserStatesList)
 async def list_chat_user_states(
     chat_id: UUID,
@@ -42,63 +134,126 @@ async def list_chat_user_states(
     current_user=Depends(get_current_user),
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
     trusted: Optional[bool] = Query(None),
     external_user_id: Optional[int] = Query(None),
+    # exact stays the default; counter/estimate are opt-in
+    count: CountStrategy = Query(CountStrategy.EXACT),
+    conditional: ConditionalGet = Depends(),
 ) -> UserStatesList:
     await _ensure_chat_owned(session, chat_id, current_user)
 
-    stmt = select(UserStates).where(UserStates.chat_id == chat_id)
-    count_stmt = select(func.count()).select_from(UserStates).where(UserStates.chat_id == chat_id)
+    conditions = [UserStates.chat_id == chat_id]
 
     if trusted is not None:
-        stmt = stmt.where(UserStates.trusted == trusted)
-        count_stmt = count_stmt.where(UserStates.trusted == trusted)
+        conditions.append(UserStates.trusted == trusted)
 
     if external_user_id is not None:
-        stmt = stmt.where(UserStates.external_user_id == external_user_id)
-        count_stmt = count_stmt.where(UserStates.external_user_id == external_user_id)
+        conditions.append(UserStates.external_user_id == external_user_id)
 
-    stmt = stmt.order_by(UserStates.updated_at.desc()).offset(offset).limit(limit)
+    # max(updated_at) is served by idx_user_states_chat_updated; the
+    # trigger-maintained counters catch deletions without a count(*)
+    counts = ChatMemberCounts.c
+    await conditional.check_probe(
+        session,
+        select(
+            select(func.max(UserStates.updated_at))
+            .where(*conditions)
+            .scalar_subquery(),
+            select(counts.trusted_count)
+            .where(counts.chat_id == chat_id)
+            .scalar_subquery(),
+            select(counts.untrusted_count)
+            .where(counts.chat_id == chat_id)
+            .scalar_subquery(),
+        ),
+    )
 
-    total = (await session.execute(count_stmt)).scalar_one()
+    stmt = select(UserStates).where(*conditions)
+
+    # cursor takes precedence over offset
+    stmt = user_states_keyset.apply(stmt, cursor, limit)
+    if cursor is None:
+        stmt = stmt.offset(offset)
+
+    total, total_is_estimate = await _count_user_states(
+        session,
+        chat_id,
+        trusted,
+        external_user_id,
+        count,
+    )
     res = await session.execute(stmt)
-    items = res.scalars().all()
+    items, next_cursor = user_states_keyset.page(res.scalars().all(), limit)
 
     return UserStatesList(
         items=[UserStateResponse.model_validate(x) for x in items],
         limit=limit,
         offset=offset,
         total=total,
+        total_is_estimate=total_is_estimate,
+        next_cursor=next_cursor,
     )
 
 
-@router.patch("/{chat_id}/user-states/{state_id}", response_model=UserStateResponse)
-async def update_user_state(
+@router.post("/{chat_id}/user-states", response_model=UserStateResponse)
+async def ensure_user_state(
     chat_id: UUID,
-    state_id: UUID,
-    payload: UserStateUpdate,
+    payload: UserStateEnsure,
+    response: Response,
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ) -> UserStateResponse:
-    await _ensure_chat_owned(session, chat_id, current_user)
+    """Fetch-or-create: 201 when the state was created, 200 otherwise."""
+    row = await upsert_user_state(
+        session,
+        chat_id,
+        payload.external_user_id,
+        owner_id=current_user.id,
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Chat not found")
+
+    obj = UserStateResponse.model_validate(row)
+    if row.created:
+        await emit_changes(session, _user_state_event(obj, "user_state.created"))  # noqa: E501
+        response.status_code = status.HTTP_201_CREATED
+    await session.commit()
+    if row.created:
+        dashboard_cache.pop(current_user.id)
+    return obj
+
 
-    stmt = select(UserStates).where(
+def _user_state_where(chat_id: UUID, state_id: UUID, current_user) -> list:
+    return [
         UserStates.id == state_id,
         UserStates.chat_id == chat_id,
-    )
-    res = await session.execute(stmt)
-    obj = res.scalar_one_or_none()
+        chat_owned_by(UserStates.chat_id, current_user.id),
+    ]
 
-    if obj is None:
-        raise HTTPException(status_code=404, detail="User state not found")
 
+@router.patch("/{chat_id}/user-states/{state_id}", response_model=UserStateResponse)
+async def update_user_state(
+    chat_id: UUID,
+    state_id: UUID,
+    payload: UserStateUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+) -> UserStateResponse:
     data = payload.model_dump(exclude_unset=True)
-    for k, v in data.items():
-        setattr(obj, k, v)
+    obj = await update_returning(
+        session,
+        UserStates,
+        _user_state_where(chat_id, state_id, current_user),
+        data,
+        UserStateResponse,
+        not_found="User state not found",
+    )
 
+    await emit_changes(session, _user_state_event(obj, "user_state.updated"))
     await session.commit()
-    await session.refresh(obj)
-    return UserStateResponse.model_validate(obj)
+    dashboard_cache.pop(current_user.id)
+    return obj
 
 
 @router.post("/{chat_id}/user-states/{state_id}/make-untrusted", response_model=UserStateResponse)
@@ -108,25 +263,110 @@ async def make_untrusted(
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ) -> UserStateResponse:
-    await _ensure_chat_owned(session, chat_id, current_user)
+    obj = await update_returning(
+        session,
+        UserStates,
+        _user_state_where(chat_id, state_id, current_user),
+        {
+            "trusted": False,
+            "valid_messages": 0,
+            # Reset joined_at to current time
+            "joined_at": func.now(),
+        },
+        UserStateResponse,
+        not_found="User state not found",
+    )
 
-    stmt = select(UserStates).where(
-        UserStates.id == state_id,
-        UserStates.chat_id == chat_id,
+    await emit_changes(
+        session,
+        _user_state_event(obj, "user_state.made_untrusted"),
     )
-    res = await session.execute(stmt)
-    obj = res.scalar_one_or_none()
+    await session.commit()
+    dashboard_cache.pop(current_user.id)
+    return obj
 
-    if obj is None:
-        raise HTTPException(status_code=404, detail="User state not found")
 
-    obj.trusted = False
-    obj.joined_at = None
-    obj.valid_messages = 0
+@router.patch("/{chat_id}/user-states", response_model=UserStatesBulkResponse)
+async def bulk_update_user_states(
+    chat_id: UUID,
+    payload: UserStatesBulkUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+) -> UserStatesBulkResponse:
+    state_ids = list(dict.fromkeys(payload.state_ids))
+    external_user_ids = list(dict.fromkeys(payload.external_user_ids))
+    if not state_ids and not external_user_ids:
+        raise HTTPException(status_code=422, detail="Nothing to update")
 
-    # Reset joined_at to current time
-    obj.joined_at = (await session.execute(select(func.now()))).scalar_one()
+    if payload.action == UserStateBulkAction.TRUST:
+        data = {"trusted": True}
+        event_type = "user_state.updated"
+    else:
+        data = {"trusted": False, "valid_messages": 0, "joined_at": func.now()}
+        event_type = "user_state.made_untrusted"
 
-    await session.commit()
-    await session.refresh(obj)
-    return UserStateResponse.model_validate(obj)
+    log.info(
+        f"Bulk {payload.action.value} of {len(state_ids) + len(external_user_ids)} user states in chat {chat_id} by user: {current_user.id}"  # noqa: E501
+    )
+
+    # Each id list is a single array parameter: `= ANY($n)`
+    table = UserStates.__table__
+    stmt = (
+        update(table)
+        .where(
+            table.c.chat_id == chat_id,
+            chat_owned_by(table.c.chat_id, current_user.id),
+            or_(
+                table.c.id == any_(
+                    bindparam("state_ids", state_ids, type_=ARRAY(Uuid))
+                ),
+                table.c.external_user_id == any_(
+                    bindparam(
+                        "external_user_ids",
+                        external_user_ids,
+                        type_=ARRAY(BigInteger),
+                    )
+                ),
+            ),
+        )
+        .values(**data)
+        .returning(*table.c)
+    )
+    res = await session.execute(stmt)
+    updated = [UserStateResponse.model_validate(x) for x in res.all()]
+
+    if not updated:
+        # Only an empty result pays for telling "no such chat" apart
+        await _ensure_chat_owned(session, chat_id, current_user)
+    else:
+        await emit_changes(
+            session,
+            *[_user_state_event(x, event_type) for x in updated],
+        )
+        await session.commit()
+        dashboard_cache.pop(current_user.id)
+
+    by_id = {x.id: x for x in updated}
+    by_external_id = {x.external_user_id: x for x in updated}
+    items = [
+        UserStateBulkItem(
+            state_id=x,
+            status="updated" if x in by_id else "not_found",
+            state=by_id.get(x),
+        )
+        for x in state_ids
+    ] + [
+        UserStateBulkItem(
+            external_user_id=x,
+            status="updated" if x in by_external_id else "not_found",
+            state=by_external_id.get(x),
+        )
+        for x in external_user_ids
+    ]
+    not_found = sum(1 for x in items if x.status == "not_found")
+
+    return UserStatesBulkResponse(
+        items=items,
+        updated=len(updated),
+        not_found=not_found,
+    )
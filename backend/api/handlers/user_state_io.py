@@ -0,0 +1,276 @@
+import csv
+import io
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps.auth import get_current_user
+from cache import dashboard_cache
+from database import db_helper
+from database.outbox import ChangeEvent, emit_changes
+from database.models import UserStates
+from database.schemas.user_state import ExportFormat, UserStatesImportResult
+from logger import get_logger
+from settings import settings
+
+from .user_state import _ensure_chat_owned
+
+log = get_logger(__name__)
+get_session = db_helper.session_getter
+
+router = APIRouter(prefix="/chats", tags=["user_states"])
+
+EXPORT_FIELDS = (
+    "id",
+    "external_user_id",
+    "trusted",
+    "joined_at",
+    "valid_messages",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+EXPORT_BATCH = 1000
+
+MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+IMPORT_TABLE = "tmp_trusted_import"
+IMPORT_MAX_LINE = 1024
+BIGINT_MAX = 2**63 - 1
+
+# One statement: dedupe, upsert, count. Rows that are already trusted are
+# not touched (the DO UPDATE ... WHERE filters them) and not returned.
+IMPORT_MERGE_SQL = text(f"""
+WITH src AS (
+  SELECT DISTINCT external_user_id FROM {IMPORT_TABLE}
+),
+up AS (
+  INSERT INTO user_states (
+    id, chat_id, external_user_id, trusted, valid_messages, joined_at,
+    is_active
+  )
+  SELECT gen_random_uuid(), CAST(:chat_id AS uuid), external_user_id,
+         true, 0, now(), true
+    FROM src
+  ON CONFLICT ON CONSTRAINT uk_user_states_chat_external_user DO UPDATE
+     SET trusted = true
+   WHERE NOT user_states.trusted
+  RETURNING (xmax = 0) AS inserted
+)
+SELECT (SELECT count(*) FROM {IMPORT_TABLE}) AS total,
+       (SELECT count(*) FROM src) AS distinct_ids,
+       count(*) FILTER (WHERE inserted) AS inserted,
+       count(*) FILTER (WHERE NOT inserted) AS updated
+  FROM up
+""")
+
+
+def _encode_ndjson(rows) -> bytes:
+    return b"".join(
+        orjson.dumps(dict(row._mapping), option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+
+def _encode_csv(rows, header: bool = False) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        writer.writerow(
+            "" if v is None else v.isoformat() if hasattr(v, "isoformat") else v  # noqa: E501
+            for v in row
+        )
+    return buf.getvalue().encode()
+
+
+async def _export_rows(stmt: Select, fmt: ExportFormat) -> AsyncIterator[bytes]:  # noqa: E501
+    # Own session: the request-scoped one may be closed before the body
+    # is fully sent. yield_per keeps a server-side cursor, so memory is
+    # bounded by EXPORT_BATCH rows whatever the chat size.
+    if fmt == ExportFormat.CSV:
+        yield _encode_csv((), header=True)
+
+    async with db_helper.session_factory() as session:
+        result = await session.stream(
+            stmt.execution_options(yield_per=EXPORT_BATCH)
+        )
+        async for rows in result.partitions():
+            if fmt == ExportFormat.CSV:
+                yield _encode_csv(rows)
+            else:
+                yield _encode_ndjson(rows)
+
+
+@router.get("/{chat_id}/user-states/export")
+async def export_chat_user_states(
+    chat_id: UUID,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    trusted: Optional[bool] = Query(None),
+) -> StreamingResponse:
+    await _ensure_chat_owned(session, chat_id, current_user)
+
+    stmt = (
+        select(*[getattr(UserStates, f) for f in EXPORT_FIELDS])
+        .where(UserStates.chat_id == chat_id)
+        # served by idx_user_states_chat_updated, no sort step
+        .order_by(UserStates.updated_at, UserStates.id)
+    )
+    if trusted is not None:
+        stmt = stmt.where(UserStates.trusted == trusted)
+
+    log.info(f"Exporting user states of chat {chat_id} as {format.value} for user: {current_user.id}")  # noqa: E501
+    filename = f"user-states-{chat_id}.{format.value}"
+    return StreamingResponse(
+        _export_rows(stmt, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+class _ImportCounter:
+    def __init__(self) -> None:
+        self.rows = 0
+        self.invalid = 0
+
+
+class _IdOutOfRange(ValueError):
+    pass
+
+
+def _parse_id(line: bytes, fmt: ExportFormat) -> int:
+    if fmt == ExportFormat.NDJSON:
+        value = orjson.loads(line)
+        if isinstance(value, dict):
+            value = value["external_user_id"]
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(line)
+        value = int(value)
+    else:
+        value = int(line.split(b",", 1)[0].strip().strip(b'"'))
+
+    # external_user_id is a positive bigint; anything else would fail the
+    # COPY encoding and abort the whole import
+    if not 1 <= value <= BIGINT_MAX:
+        raise _IdOutOfRange(value)
+    return value
+
+
+async def _body_lines(request: Request) -> AsyncIterator[bytes]:
+    """Splits the body as it arrives; only one partial line is buffered."""
+    buf = b""
+    async for chunk in request.stream():
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        if len(buf) > IMPORT_MAX_LINE:
+            raise HTTPException(status_code=400, detail="Line too long")
+        for line in lines:
+            yield line
+    yield buf
+
+
+async def _import_records(
+    request: Request,
+    fmt: ExportFormat,
+    counter: _ImportCounter,
+) -> AsyncIterator[tuple[int]]:
+    first = True
+    async for line in _body_lines(request):
+        line = line.strip()
+        if not line:
+            continue
+
+        is_first, first = first, False
+        try:
+            external_user_id = _parse_id(line, fmt)
+        except _IdOutOfRange:
+            counter.invalid += 1
+            continue
+        except (ValueError, KeyError, TypeError):
+            # a non-numeric first CSV line is a header
+            if not (is_first and fmt == ExportFormat.CSV):
+                counter.invalid += 1
+            continue
+
+        counter.rows += 1
+        if counter.rows > settings.USER_STATES_IMPORT_MAX_ROWS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"More than {settings.USER_STATES_IMPORT_MAX_ROWS} rows",  # noqa: E501
+            )
+        yield (external_user_id,)
+
+
+@router.post(
+    "/{chat_id}/user-states/import",
+    response_model=UserStatesImportResult,
+)
+async def import_trusted_user_states(
+    chat_id: UUID,
+    request: Request,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+    format: ExportFormat = Query(ExportFormat.CSV),
+) -> UserStatesImportResult:
+    """
+    Marks the `external_user_id`s in the request body as trusted members,
+    creating missing states. Body: one id per line (CSV: first column,
+    optional header) or NDJSON (`123` or `{"external_user_id": 123}`).
+    """
+    await _ensure_chat_owned(session, chat_id, current_user)
+
+    await session.execute(
+        text(
+            f"CREATE TEMP TABLE {IMPORT_TABLE} "
+            "(external_user_id bigint NOT NULL) ON COMMIT DROP"
+        )
+    )
+
+    # COPY straight from the request stream through the asyncpg connection
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    counter = _ImportCounter()
+    await raw.driver_connection.copy_records_to_table(
+        IMPORT_TABLE,
+        records=_import_records(request, format, counter),
+        columns=["external_user_id"],
+    )
+
+    res = await session.execute(IMPORT_MERGE_SQL, {"chat_id": chat_id})
+    total, distinct_ids, inserted, updated = res.one()
+
+    result = UserStatesImportResult(
+        inserted=inserted,
+        updated=updated,
+        skipped=(total - inserted - updated) + counter.invalid,
+        invalid=counter.invalid,
+    )
+    if inserted or updated:
+        await emit_changes(
+            session,
+            ChangeEvent(
+                aggregate_type="chat",
+                aggregate_id=chat_id,
+                chat_id=chat_id,
+                event_type="user_states.imported",
+                payload=result.model_dump(),
+            ),
+        )
+    await session.commit()
+    dashboard_cache.pop(current_user.id)
+
+    log.info(
+        f"Imported trusted members into chat {chat_id}: {result.model_dump()} (distinct ids: {distinct_ids})"  # noqa: E501
+    )
+    return result
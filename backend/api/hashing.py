@@ -0,0 +1,135 @@
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from api.security import hash_password, verify_password
+from logger import get_logger
+from settings import settings
+
+
+log = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class HashingOverloaded(Exception):
+    """Too many password hashing calls are already queued."""
+
+
+class PasswordHashingService:
+    """
+    Runs argon2 hashing/verification on a dedicated bounded thread pool.
+
+    argon2-cffi releases the GIL while hashing, so the event loop keeps
+    serving other requests. At most `max_workers` calls run at once and at
+    most `max_queue` more may wait; anything beyond that is rejected with
+    `HashingOverloaded` instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+        self.calls = 0
+        self.rejected = 0
+        self.total_run_ms = 0.0
+        self.total_wait_ms = 0.0
+        self.max_run_ms = 0.0
+
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        log.info(f"Starting password hashing pool (workers={self.max_workers})")  # noqa: E501
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="pwd-hash",
+        )
+
+    async def shutdown(self) -> None:
+        if self._executor is None:
+            return
+        log.info("Stopping password hashing pool")
+        executor, self._executor = self._executor, None
+        # Joining the workers blocks - keep it off the event loop
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)  # noqa: E501
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._pending - self.max_workers, 0)
+
+    def _finished(self, name: str, submitted: float, started: float) -> None:
+        self._pending -= 1
+        if started:
+            run_ms = (time.perf_counter() - started) * 1000
+            self.calls += 1
+            self.total_run_ms += run_ms
+            self.total_wait_ms += (started - submitted) * 1000
+            self.max_run_ms = max(self.max_run_ms, run_ms)
+            log.debug(f"{name} took {run_ms:.1f} ms")
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            self.start()
+
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            log.warning("Password hashing pool is saturated, rejecting call")
+            raise HashingOverloaded()
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        started = 0.0
+
+        def timed() -> T:
+            nonlocal started
+            started = time.perf_counter()
+            return fn(*args)
+
+        def done(_future: Future) -> None:
+            # Runs when the thread finishes, not when the awaiting task is
+            # cancelled: an abandoned hash keeps its slot until it is done
+            try:
+                loop.call_soon_threadsafe(
+                    self._finished, fn.__name__, submitted, started,
+                )
+            except RuntimeError:
+                # loop already closed (shutdown)
+                pass
+
+        future = self._executor.submit(timed)
+        self._pending += 1
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(verify_password, password, password_hash)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "in_flight": min(self._pending, self.max_workers),
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "avg_run_ms": round(self.total_run_ms / self.calls, 2)
+            if self.calls
+            else 0.0,
+            "avg_wait_ms": round(self.total_wait_ms / self.calls, 2)
+            if self.calls
+            else 0.0,
+            "max_run_ms": round(self.max_run_ms, 2),
+        }
+
+
+password_hasher = PasswordHashingService(
+    max_workers=settings.HASHING_WORKERS,
+    max_queue=settings.HASHING_MAX_QUEUE,
+)
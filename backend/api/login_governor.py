@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import math
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from cache import redis_helper, RedisUnavailable
+from logger import get_logger
+from settings import settings
+
+
+log = get_logger(__name__)
+
+BUCKET_PREFIX = "login_bucket:"
+
+# KEYS[1] bucket key, ARGV[1] refill rate (tokens/s), ARGV[2] burst.
+# Returns {allowed (0/1), retry_after_s}.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(now - ts, 0) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry_after = math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, retry_after}
+"""
+
+
+class LoginRejected(Exception):
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class LoginGovernor:
+    """
+    Admission control for the login endpoint.
+
+    1) Per-IP and per-email token buckets in Redis (429 when empty).
+       Buckets fail open when Redis is unavailable - the concurrency cap
+       below still bounds CPU.
+    2) A fixed number of concurrent logins with a short bounded wait queue;
+       anything beyond that, or waiting longer than `wait_timeout_s`, gets
+       503 with Retry-After instead of queueing behind argon2.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_waiting: int,
+        wait_timeout_s: float,
+        ip_rate_per_min: float,
+        ip_burst: int,
+        email_rate_per_min: float,
+        email_burst: int,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.wait_timeout_s = wait_timeout_s
+        self.ip_rate = ip_rate_per_min / 60
+        self.ip_burst = ip_burst
+        self.email_rate = email_rate_per_min / 60
+        self.email_burst = email_burst
+
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._active = 0
+        self._waiting = 0
+        self._script: Any = None
+        self._script_client: Any = None
+
+        self.admitted = 0
+        self.shed = 0
+        self.rate_limited = 0
+
+    async def _take_token(self, key: str, rate: float, burst: int) -> int:
+        """Returns 0 if allowed, else seconds until a token is available."""
+        try:
+            async with redis_helper.guard() as r:
+                if self._script is None or self._script_client is not r:
+                    self._script = r.register_script(TOKEN_BUCKET_LUA)
+                    self._script_client = r
+                allowed, retry_after = await self._script(
+                    keys=[f"{BUCKET_PREFIX}{key}"],
+                    args=[rate, burst],
+                )
+        except RedisUnavailable:
+            return 0
+        return 0 if int(allowed) else max(int(retry_after), 1)
+
+    async def _check_buckets(self, ip: str, email: str) -> None:
+        email_digest = hashlib.sha256(email.lower().encode()).hexdigest()
+        for key, rate, burst in (
+            (f"ip:{ip}", self.ip_rate, self.ip_burst),
+            (f"email:{email_digest}", self.email_rate, self.email_burst),
+        ):
+            retry_after = await self._take_token(key, rate, burst)
+            if retry_after:
+                self.rate_limited += 1
+                log.warning(f"Login rate limited: {key.split(':')[0]} bucket empty")  # noqa: E501
+                raise LoginRejected(429, retry_after, "Too many login attempts")  # noqa: E501
+
+    def _busy(self) -> LoginRejected:
+        self.shed += 1
+        return LoginRejected(
+            503,
+            max(math.ceil(self.wait_timeout_s), 1),
+            "Server busy, try again later",
+        )
+
+    @asynccontextmanager
+    async def admit(self, ip: str, email: str) -> AsyncIterator[None]:
+        await self._check_buckets(ip, email)
+
+        if self._sem.locked() and self._waiting >= self.max_waiting:
+            raise self._busy()
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(
+                self._sem.acquire(),
+                timeout=self.wait_timeout_s,
+            )
+        except asyncio.TimeoutError:
+            raise self._busy()
+        finally:
+            self._waiting -= 1
+
+        self._active += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._sem.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "waiting": self._waiting,
+            "max_waiting": self.max_waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "rate_limited": self.rate_limited,
+        }
+
+
+login_governor = LoginGovernor(
+    max_concurrency=settings.LOGIN_MAX_CONCURRENCY,
+    max_waiting=settings.LOGIN_MAX_WAITING,
+    wait_timeout_s=settings.LOGIN_WAIT_TIMEOUT_S,
+    ip_rate_per_min=settings.LOGIN_IP_RATE_PER_MIN,
+    ip_burst=settings.LOGIN_IP_BURST,
+    email_rate_per_min=settings.LOGIN_EMAIL_RATE_PER_MIN,
+    email_burst=settings.LOGIN_EMAIL_BURST,
+)
@@ -1,3 +1,5 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from uuid import UUID
@@ -5,15 +7,35 @@ from uuid import UUID
 import jwt
 from passlib.context import CryptContext
 
+from cache import TTLCache
 from settings import settings
 from logger import get_logger
 
 
 log = get_logger(__name__)
 
+# Verified payloads keyed by sha256(token); entries live until the token's exp
+_token_cache: TTLCache[bytes, dict[str, Any]] = TTLCache(
+    max_size=settings.JWT_CACHE_SIZE,
+    ttl_s=settings.JWT_ACCESS_TTL_MIN * 60,
+)
+_token_cache_key_id: bytes = b""
+
+
+def _argon2_options() -> dict[str, int]:
+    # Unset values fall back to passlib's argon2 defaults
+    options = {
+        "argon2__time_cost": settings.ARGON2_TIME_COST,
+        "argon2__memory_cost": settings.ARGON2_MEMORY_COST,
+        "argon2__parallelism": settings.ARGON2_PARALLELISM,
+    }
+    return {k: v for k, v in options.items() if v is not None}
+
+
 pwd_context = CryptContext(
     schemes=["argon2"],
     deprecated="auto",
+    **_argon2_options(),
 )
 
 
@@ -27,6 +49,11 @@ def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
 
+def password_needs_rehash(password_hash: str) -> bool:
+    """True if the hash was made with different argon2 parameters."""
+    return pwd_context.needs_update(password_hash)
+
+
 def create_access_token(*, sub: UUID, ttl_minutes: int) -> str:
     log.debug(f"Creating access token for user: {sub}, TTL: {ttl_minutes} minutes")
     now = datetime.now(timezone.utc)
@@ -40,7 +67,37 @@ def create_access_token(*, sub: UUID, ttl_minutes: int) -> str:
     return token
 
 
+def _signing_key_id() -> bytes:
+    return hashlib.sha256(
+        f"{settings.JWT_ALG}:{settings.JWT_SECRET}".encode()
+    ).digest()
+
+
+def clear_token_cache() -> None:
+    log.info("Clearing verified token cache")
+    _token_cache.clear()
+
+
+def token_cache_stats() -> dict[str, int]:
+    return _token_cache.stats()
+
+
 def decode_token(token: str) -> dict[str, Any]:
+    global _token_cache_key_id
+
+    # Signing key rotated -> nothing verified with the old key is trusted
+    key_id = _signing_key_id()
+    if key_id != _token_cache_key_id:
+        clear_token_cache()
+        _token_cache_key_id = key_id
+
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(digest)
+    if cached is not None:
+        if cached["exp"] > time.time():
+            return dict(cached)
+        _token_cache.pop(digest)
+
     log.debug("Decoding JWT token")
     try:
         decoded_payload = jwt.decode(
@@ -49,6 +106,14 @@ def decode_token(token: str) -> dict[str, Any]:
             algorithms=[settings.JWT_ALG],
         )
         log.info("Successfully decoded JWT token")
+
+        exp = decoded_payload.get("exp")
+        if isinstance(exp, (int, float)):
+            _token_cache.set(
+                digest,
+                dict(decoded_payload),
+                ttl_s=exp - time.time(),
+            )
         return decoded_payload
     except jwt.ExpiredSignatureError:
         log.info("JWT token has expired")
@@ -0,0 +1,18 @@
+__all__ = [
+    "redis_helper",
+    "RedisUnavailable",
+    "TTLCache",
+    "user_cache",
+    "policy_cache",
+    "CompiledPolicy",
+    "RedisLease",
+    "dashboard_cache",
+]
+
+
+from .helper import redis_helper, RedisUnavailable
+from .lru import TTLCache
+from .user_cache import user_cache
+from .policy_cache import policy_cache, CompiledPolicy
+from .lease import RedisLease
+from .dashboard_cache import dashboard_cache
@@ -0,0 +1,15 @@
+from typing import Any
+from uuid import UUID
+
+from settings import settings
+
+from .lru import TTLCache
+
+
+# Per-process cache of GET /dashboard/summary, keyed by user id. Chat,
+# link and user-state writers in this process pop the owner's entry; bot
+# counter bumps and other workers converge within the TTL.
+dashboard_cache: TTLCache[UUID, Any] = TTLCache(
+    max_size=settings.DASHBOARD_CACHE_SIZE,
+    ttl_s=settings.DASHBOARD_CACHE_TTL_S,
+)
@@ -0,0 +1,151 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional
+
+import redis.asyncio as redis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from logger import get_logger
+from settings import settings
+
+
+log = get_logger(__name__)
+
+
+class RedisUnavailable(Exception):
+    """Redis is down (or the breaker is open) - callers should fail fast."""
+
+
+class RedisHelper:
+    """
+    Backend-wide Redis client over a single bounded connection pool.
+
+    The pool is created in the app lifespan (`start`) and closed on shutdown
+    (`dispose`). All calls should go through `guard()`, which implements a
+    simple circuit breaker: after `failure_threshold` consecutive connection
+    errors/timeouts the breaker opens for `reset_timeout_s` and every call
+    fails immediately with `RedisUnavailable` instead of waiting on dead
+    sockets. The first call after the window is a probe: success closes the
+    breaker, failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        pool_size: int,
+        pool_timeout_s: float,
+        socket_timeout_s: float,
+        socket_connect_timeout_s: float,
+        failure_threshold: int,
+        reset_timeout_s: float,
+    ):
+        self.url = url
+        self.pool_size = pool_size
+        self.pool_timeout_s = pool_timeout_s
+        self.socket_timeout_s = socket_timeout_s
+        self.socket_connect_timeout_s = socket_connect_timeout_s
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+
+        self.pool: Optional[redis.BlockingConnectionPool] = None
+        self.client: Optional[redis.Redis] = None
+
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._short_circuited = 0
+        self._total_failures = 0
+
+    async def start(self) -> None:
+        if self.client is not None:
+            return
+
+        log.info(f"Creating Redis connection pool (size={self.pool_size})")
+        self.pool = redis.BlockingConnectionPool.from_url(
+            self.url,
+            max_connections=self.pool_size,
+            timeout=self.pool_timeout_s,
+            socket_timeout=self.socket_timeout_s,
+            socket_connect_timeout=self.socket_connect_timeout_s,
+            health_check_interval=30,
+            decode_responses=True,
+        )
+        self.client = redis.Redis(connection_pool=self.pool)
+
+        # Warm-up only: the app must still start when Redis is down
+        try:
+            async with self.guard() as r:
+                await r.ping()
+        except RedisUnavailable:
+            log.warning("Redis is not reachable at startup")
+
+    async def dispose(self) -> None:
+        if self.client is None:
+            return
+        log.info("Closing Redis connection pool")
+        await self.client.aclose()
+        self.client = None
+        self.pool = None
+
+    @property
+    def is_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    @asynccontextmanager
+    async def guard(self) -> AsyncIterator[redis.Redis]:
+        if self.client is None:
+            raise RedisUnavailable("Redis is not initialized")
+
+        if self.is_open:
+            self._short_circuited += 1
+            raise RedisUnavailable("Redis unavailable")
+
+        try:
+            yield self.client
+        except (RedisConnectionError, RedisTimeoutError, OSError) as e:
+            self._record_failure(e)
+            raise RedisUnavailable(str(e)) from e
+        else:
+            self._consecutive_failures = 0
+
+    def _record_failure(self, exc: Exception) -> None:
+        self._consecutive_failures += 1
+        self._total_failures += 1
+        if self._consecutive_failures >= self.failure_threshold:
+            self._open_until = time.monotonic() + self.reset_timeout_s
+            log.warning(
+                f"Redis circuit breaker open for {self.reset_timeout_s}s "
+                f"after {self._consecutive_failures} failures: {exc}"
+            )
+
+    def stats(self) -> dict[str, Any]:
+        in_use = available = 0
+        if self.pool is not None:
+            in_use = len(getattr(self.pool, "_in_use_connections", ()))
+            available = len(getattr(self.pool, "_available_connections", ()))
+
+        return {
+            "state": "open" if self.is_open else "closed",
+            "consecutive_failures": self._consecutive_failures,
+            "total_failures": self._total_failures,
+            "short_circuited": self._short_circuited,
+            "pool": {
+                "max_connections": self.pool_size,
+                "in_use": in_use,
+                "idle": available,
+                "utilisation": round(in_use / self.pool_size, 3)
+                if self.pool_size
+                else 0.0,
+            },
+        }
+
+
+redis_helper = RedisHelper(
+    url=settings.REDIS_URL,
+    pool_size=settings.REDIS_POOL_SIZE,
+    pool_timeout_s=settings.REDIS_POOL_TIMEOUT_S,
+    socket_timeout_s=settings.REDIS_SOCKET_TIMEOUT_S,
+    socket_connect_timeout_s=settings.REDIS_SOCKET_CONNECT_TIMEOUT_S,
+    failure_threshold=settings.REDIS_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout_s=settings.REDIS_BREAKER_RESET_S,
+)
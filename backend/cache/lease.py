@@ -0,0 +1,44 @@
+import uuid
+from typing import Any
+
+from .helper import redis_helper
+
+
+# KEYS[1] lease key, ARGV[1] owner token. Deletes only our own lease.
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLease:
+    """
+    Best-effort single-runner lease for background jobs across workers.
+
+    `SET key token NX PX ttl`; released with a compare-and-delete so an
+    expired lease taken over by another worker is never dropped by us.
+    `ttl_s` must comfortably exceed one run of the job. Raises
+    `RedisUnavailable` like every `redis_helper.guard()` call.
+    """
+
+    def __init__(self, key: str, ttl_s: float):
+        self.key = key
+        self.ttl_ms = int(ttl_s * 1000)
+        self.token = uuid.uuid4().hex
+        self._script: Any = None
+        self._script_client: Any = None
+
+    async def acquire(self) -> bool:
+        async with redis_helper.guard() as r:
+            return bool(
+                await r.set(self.key, self.token, nx=True, px=self.ttl_ms)
+            )
+
+    async def release(self) -> None:
+        async with redis_helper.guard() as r:
+            if self._script is None or self._script_client is not r:
+                self._script = r.register_script(RELEASE_LUA)
+                self._script_client = r
+            await self._script(keys=[self.key], args=[self.token])
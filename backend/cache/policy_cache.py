@@ -0,0 +1,20 @@
+from typing import NamedTuple
+from uuid import UUID
+
+from settings import settings
+
+from .lru import TTLCache
+
+
+class CompiledPolicy(NamedTuple):
+    owner_id: UUID
+    etag: str
+    body: bytes
+
+
+# Per-process cache of serialized policy bundles. Writers in this process
+# pop the chat's entry; other workers converge within the TTL.
+policy_cache: TTLCache[UUID, CompiledPolicy] = TTLCache(
+    max_size=settings.POLICY_CACHE_SIZE,
+    ttl_s=settings.POLICY_CACHE_TTL_S,
+)
@@ -0,0 +1,181 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+import orjson
+
+from database.models import Users
+from logger import get_logger
+from settings import settings
+
+from .helper import redis_helper, RedisUnavailable
+from .lru import TTLCache
+
+
+log = get_logger(__name__)
+
+KEY_PREFIX = "user_cache:"
+INVALIDATE_CHANNEL = "user_cache:invalidate"
+
+# password_hash is deliberately not cached
+_FIELDS = (
+    "id",
+    "created_at",
+    "updated_at",
+    "is_active",
+    "username",
+    "email",
+    "telegram_user_id",
+    "discord_user_id",
+)
+
+
+def _dump(user: Users) -> dict[str, Any]:
+    return {f: getattr(user, f) for f in _FIELDS}
+
+
+def _load(data: dict[str, Any]) -> Users:
+    data = dict(data)
+    data["id"] = UUID(str(data["id"]))
+    for f in ("created_at", "updated_at"):
+        if isinstance(data[f], str):
+            data[f] = datetime.fromisoformat(data[f])
+    # Transient (never attached to a session) - read-only use in handlers
+    return Users(**data)
+
+
+class UserCache:
+    """
+    Two-level cache of authenticated, active users keyed by JWT `sub`.
+
+    L1 is a per-process LRU with a short TTL, L2 is Redis shared between
+    workers. `invalidate()` drops the Redis key and broadcasts the id on
+    `INVALIDATE_CHANNEL` so every worker evicts its L1 entry. The admin
+    (User post_save/post_delete) and the bot (telegram linkage) do the same:
+    `DEL user_cache:<uuid>` + `PUBLISH user_cache:invalidate <uuid>`.
+    """
+
+    def __init__(self, max_size: int, local_ttl_s: float, redis_ttl_s: int):
+        self.local: TTLCache[UUID, dict[str, Any]] = TTLCache(
+            max_size=max_size,
+            ttl_s=local_ttl_s,
+        )
+        self.redis_ttl_s = redis_ttl_s
+
+        self.redis_hits = 0
+        self.redis_misses = 0
+
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def get(self, user_id: UUID) -> Optional[Users]:
+        data = self.local.get(user_id)
+        if data is not None:
+            return _load(data)
+
+        try:
+            async with redis_helper.guard() as r:
+                raw = await r.get(f"{KEY_PREFIX}{user_id}")
+        except RedisUnavailable:
+            return None
+
+        if raw is None:
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        data = orjson.loads(raw)
+        self.local.set(user_id, data)
+        return _load(data)
+
+    async def set(self, user: Users) -> None:
+        data = _dump(user)
+        self.local.set(user.id, data)
+
+        try:
+            async with redis_helper.guard() as r:
+                await r.set(
+                    f"{KEY_PREFIX}{user.id}",
+                    orjson.dumps(data),
+                    ex=self.redis_ttl_s,
+                )
+        except RedisUnavailable:
+            pass
+
+    async def invalidate(self, user_id: UUID) -> None:
+        log.debug(f"Invalidating cached user: {user_id}")
+        self.local.pop(user_id)
+
+        try:
+            async with redis_helper.guard() as r:
+                async with r.pipeline(transaction=False) as pipe:
+                    pipe.delete(f"{KEY_PREFIX}{user_id}")
+                    pipe.publish(INVALIDATE_CHANNEL, str(user_id))
+                    await pipe.execute()
+        except RedisUnavailable:
+            log.warning(f"Could not broadcast user cache invalidation: {user_id}")  # noqa: E501
+
+    async def start(self) -> None:
+        """Start the invalidation listener."""
+        if self._task is not None:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(
+            self._listen(),
+            name="user-cache-invalidation",
+        )
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task:
+            try:
+                await self._task
+            finally:
+                self._task = None
+
+    async def _listen(self) -> None:
+        while not self._stop.is_set():
+            try:
+                async with redis_helper.guard() as r:
+                    async with r.pubsub() as pubsub:
+                        await pubsub.subscribe(INVALIDATE_CHANNEL)
+                        while not self._stop.is_set():
+                            msg = await pubsub.get_message(
+                                ignore_subscribe_messages=True,
+                                timeout=1.0,
+                            )
+                            if msg is None:
+                                continue
+                            try:
+                                self.local.pop(UUID(str(msg["data"])))
+                            except ValueError:
+                                continue
+            except RedisUnavailable:
+                # Invalidations may have been missed while disconnected
+                self.local.clear()
+            except Exception:
+                log.exception("User cache invalidation listener failed")
+                self.local.clear()
+
+            try:
+                await asyncio.wait_for(
+                    self._stop.wait(),
+                    timeout=redis_helper.reset_timeout_s,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "local": self.local.stats(),
+            "redis_hits": self.redis_hits,
+            "redis_misses": self.redis_misses,
+        }
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_SIZE,
+    local_ttl_s=settings.USER_CACHE_LOCAL_TTL_S,
+    redis_ttl_s=settings.USER_CACHE_REDIS_TTL_S,
+)
@@ -0,0 +1,185 @@
+import asyncio
+import time
+from typing import Any, Optional
+
+from sqlalchemy import func, select, true, update
+
+from cache import RedisLease, RedisUnavailable
+from logger import get_logger
+from settings import settings
+
+from .helper import db_helper
+from .models import Chats, UserStates
+from .outbox import ChangeEvent, emit_changes
+
+
+log = get_logger(__name__)
+
+
+class AutoTrustSweeper:
+    """
+    Periodically promotes every eligible untrusted member across all chats:
+    `valid_messages >= chats.min_messages_required` and `joined_at` at least
+    `chats.min_observation_minutes` ago.
+
+    Each batch is one `UPDATE user_states ... FROM chats` over at most
+    `batch_size` rows (picked with SKIP LOCKED, served by the partial index
+    idx_user_states_untrusted) in its own short transaction, with outbox
+    events for the promoted states. A Redis lease keeps one worker
+    sweeping; without Redis the sweep is skipped.
+    """
+
+    def __init__(
+        self,
+        interval_s: float,
+        batch_size: int,
+        max_batches: int,
+    ):
+        self.interval_s = interval_s
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.lease = RedisLease(
+            "auto_trust:sweep_lease",
+            ttl_s=max(interval_s * 2, 60.0),
+        )
+
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+        self.runs = 0
+        self.skipped = 0
+        self.failures = 0
+        self.promoted = 0
+        self.last_promoted = 0
+        self.last_batches = 0
+        self.last_duration_s = 0.0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="auto-trust")
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task:
+            try:
+                await self._task
+            finally:
+                self._task = None
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await self.sweep_once()
+            except RedisUnavailable:
+                self.skipped += 1
+            except Exception:
+                self.failures += 1
+                log.exception("Auto-trust sweep failed")
+
+            try:
+                await asyncio.wait_for(
+                    self._stop.wait(),
+                    timeout=self.interval_s,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def _promote_stmt(self):
+        eligible = (
+            UserStates.trusted == False,  # noqa: E712
+            UserStates.is_active == True,  # noqa: E712
+            Chats.is_active == True,  # noqa: E712
+            UserStates.valid_messages >= Chats.min_messages_required,
+            UserStates.joined_at
+            <= func.now()
+            - func.make_interval(0, 0, 0, 0, 0, Chats.min_observation_minutes),
+        )
+        batch = (
+            select(UserStates.id)
+            .join(Chats, Chats.id == UserStates.chat_id)
+            .where(*eligible)
+            .limit(self.batch_size)
+            .with_for_update(of=UserStates, skip_locked=True)
+        )
+        return (
+            update(UserStates)
+            .where(
+                Chats.id == UserStates.chat_id,
+                UserStates.id.in_(batch.scalar_subquery()),
+                *eligible,
+            )
+            .values(trusted=true())
+            .returning(
+                UserStates.id,
+                UserStates.chat_id,
+                UserStates.external_user_id,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def sweep_once(self) -> int:
+        if not await self.lease.acquire():
+            self.skipped += 1
+            return 0
+
+        started = time.monotonic()
+        promoted = batches = 0
+        try:
+            while batches < self.max_batches and not self._stop.is_set():
+                async with db_helper.session_factory() as session:
+                    res = await session.execute(self._promote_stmt())
+                    rows = res.all()
+                    await emit_changes(
+                        session,
+                        *[
+                            ChangeEvent(
+                                aggregate_type="user_state",
+                                aggregate_id=row.id,
+                                chat_id=row.chat_id,
+                                event_type="user_state.auto_trusted",
+                                payload={
+                                    "external_user_id": row.external_user_id,
+                                    "trusted": True,
+                                },
+                            )
+                            for row in rows
+                        ],
+                    )
+                    await session.commit()
+
+                batches += 1
+                promoted += len(rows)
+                if len(rows) < self.batch_size:
+                    break
+        finally:
+            await self.lease.release()
+
+            self.runs += 1
+            self.promoted += promoted
+            self.last_promoted = promoted
+            self.last_batches = batches
+            self.last_duration_s = round(time.monotonic() - started, 3)
+
+        if promoted:
+            log.info(f"Auto-trusted {promoted} user states in {batches} batches")  # noqa: E501
+        return promoted
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "promoted": self.promoted,
+            "last_promoted": self.last_promoted,
+            "last_batches": self.last_batches,
+            "last_duration_s": self.last_duration_s,
+        }
+
+
+auto_trust_sweeper = AutoTrustSweeper(
+    interval_s=settings.AUTO_TRUST_INTERVAL_S,
+    batch_size=settings.AUTO_TRUST_BATCH_SIZE,
+    max_batches=settings.AUTO_TRUST_MAX_BATCHES,
+)
@@ -8,6 +8,10 @@ __all__ = [
     "ChatPrompts",
     "UserStates",
     "RuntimeStatistics",
+    "ChatMemberCounts",
+    "ChatCounters",
+    "OutboxEvents",
+    "ChatStatsBuckets",
 ]
 
 
@@ -16,3 +20,6 @@ from .user import Users
 from .prompt import Prompts, CustomPrompts
 from .chat import Chats, ChatCustomPrompts, ChatPrompts, UserStates
 from .statistics import RuntimeStatistics
+from .counters import ChatCounters, ChatMemberCounts
+from .outbox import OutboxEvents
+from .stats import ChatStatsBuckets
@@ -14,6 +14,7 @@ from sqlalchemy import (
     String,
     UniqueConstraint,
     Uuid,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -41,6 +42,7 @@ class Chats(Base):
         ),
         Index("chats_is_active_fb349602", "is_active"),
         Index("chats_user_id_7dbaf5bc", "user_id"),
+        Index("idx_chats_user_created", "user_id", "created_at", "id"),
     )
 
     type: Mapped[str] = mapped_column(String(16), nullable=False)
@@ -51,9 +53,7 @@ class Chats(Base):
     cleanup_emojis: Mapped[bool] = mapped_column(Boolean, nullable=False)
     cleanup_links: Mapped[bool] = mapped_column(Boolean, nullable=False)
     user_id: Mapped[uuid.UUID] = mapped_column(Uuid, nullable=False)
-    messages_deleted: Mapped[int] = mapped_column(Integer, nullable=False)
-    processed_messages: Mapped[int] = mapped_column(Integer, nullable=False)
-    spam_detected: Mapped[int] = mapped_column(Integer, nullable=False)
+    # message counters live in the narrow `chat_counters` table
     cleanup_emails: Mapped[bool] = mapped_column(Boolean, nullable=False)
     max_emoji_count: Mapped[int] = mapped_column(Integer, nullable=False)
     title: Mapped[Optional[str]] = mapped_column(String(255))
@@ -175,9 +175,25 @@ class UserStates(Base):
             name="user_states_chat_id_f167116e_fk_chats_id",
         ),
         PrimaryKeyConstraint("id", name="user_states_pkey"),
-        Index("idx_user_states_chat_extuser", "chat_id", "external_user_id"),
+        UniqueConstraint(
+            "chat_id",
+            "external_user_id",
+            name="uk_user_states_chat_external_user",
+        ),
         Index("user_states_chat_id_f167116e", "chat_id"),
         Index("user_states_is_active_5312b655", "is_active"),
+        Index(
+            "idx_user_states_chat_updated",
+            "chat_id",
+            "updated_at",
+            "id",
+        ),
+        Index(
+            "idx_user_states_untrusted",
+            "chat_id",
+            "valid_messages",
+            postgresql_where=text("NOT trusted AND is_active"),
+        ),
     )
 
     external_user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -0,0 +1,39 @@
+from sqlalchemy import BigInteger, Column, ForeignKeyConstraint, Table, Uuid
+
+from .base import Base
+
+
+# Narrow tables without the common Base columns (id/created_at/...).
+
+# Maintained by a trigger on user_states (admin migration 0007)
+ChatMemberCounts = Table(
+    "chat_member_counts",
+    Base.metadata,
+    Column("chat_id", Uuid, primary_key=True),
+    Column("trusted_count", BigInteger, nullable=False),
+    Column("untrusted_count", BigInteger, nullable=False),
+    ForeignKeyConstraint(
+        ["chat_id"],
+        ["chats.id"],
+        deferrable=True,
+        initially="DEFERRED",
+    ),
+)
+
+
+# Per-message counters split out of `chats` (admin migration 0010); the row
+# is created by a trigger on chats and bumped by the bot.
+ChatCounters = Table(
+    "chat_counters",
+    Base.metadata,
+    Column("chat_id", Uuid, primary_key=True),
+    Column("processed_messages", BigInteger, nullable=False),
+    Column("spam_detected", BigInteger, nullable=False),
+    Column("messages_deleted", BigInteger, nullable=False),
+    ForeignKeyConstraint(
+        ["chat_id"],
+        ["chats.id"],
+        deferrable=True,
+        initially="DEFERRED",
+    ),
+)
@@ -0,0 +1,31 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    String,
+    Table,
+    Uuid,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from .base import Base
+
+
+# Written in the same transaction as the change, drained by OutboxRelay
+OutboxEvents = Table(
+    "outbox_events",
+    Base.metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("aggregate_type", String(32), nullable=False),
+    Column("aggregate_id", Uuid, nullable=False),
+    Column("chat_id", Uuid),
+    Column("event_type", String(64), nullable=False),
+    Column("payload", JSONB, nullable=False),
+    Column(
+        "created_at",
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    ),
+)
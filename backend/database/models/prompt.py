@@ -23,6 +23,7 @@ class Prompts(Base):
     __table_args__ = (
         PrimaryKeyConstraint("id", name="prompts_pkey"),
         Index("prompts_is_active_9a1a4767", "is_active"),
+        Index("idx_prompts_created", "created_at", "id"),
     )
 
     name: Mapped[Optional[str]] = mapped_column(String(100))
@@ -46,6 +47,12 @@ class CustomPrompts(Base):
         PrimaryKeyConstraint("id", name="custom_prompts_pkey"),
         Index("custom_prompts_is_active_61d93681", "is_active"),
         Index("custom_prompts_user_id_2a2ed8b5", "user_id"),
+        Index(
+            "idx_cprompts_user_created",
+            "user_id",
+            "created_at",
+            "id",
+        ),
     )
 
     user_id: Mapped[uuid.UUID] = mapped_column(Uuid, nullable=False)
@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Index,
     Integer,
     PrimaryKeyConstraint,
@@ -24,3 +25,8 @@ class RuntimeStatistics(Base):
     ai_requests_made: Mapped[int] = mapped_column(Integer, nullable=False)
     messages_deleted: Mapped[int] = mapped_column(Integer, nullable=False)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
+    last_flush_batch: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default="0",
+    )
@@ -0,0 +1,39 @@
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKeyConstraint,
+    String,
+    Table,
+    UniqueConstraint,
+    Uuid,
+)
+
+from .base import Base
+
+
+# Minute buckets come from a trigger on chat_counters (admin migrations
+# 0009, 0010); StatsRollup folds them into hour and day buckets.
+ChatStatsBuckets = Table(
+    "chat_stats_buckets",
+    Base.metadata,
+    Column("id", BigInteger, primary_key=True, autoincrement=True),
+    Column("chat_id", Uuid, nullable=False),
+    Column("granularity", String(8), nullable=False),
+    Column("bucket_start", DateTime(timezone=True), nullable=False),
+    Column("processed_messages", BigInteger, nullable=False),
+    Column("spam_detected", BigInteger, nullable=False),
+    Column("messages_deleted", BigInteger, nullable=False),
+    UniqueConstraint(
+        "chat_id",
+        "granularity",
+        "bucket_start",
+        name="uk_chat_stats_buckets_chat_gran_start",
+    ),
+    ForeignKeyConstraint(
+        ["chat_id"],
+        ["chats.id"],
+        deferrable=True,
+        initially="DEFERRED",
+    ),
+)
@@ -0,0 +1,180 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from uuid import UUID
+
+import orjson
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import redis_helper, RedisUnavailable
+from logger import get_logger
+from settings import settings
+
+from .helper import db_helper
+from .models import OutboxEvents
+
+
+log = get_logger(__name__)
+
+
+@dataclass
+class ChangeEvent:
+    aggregate_type: str  # "chat" | "user_state" | ...
+    aggregate_id: UUID
+    event_type: str  # e.g. "chat.settings_updated"
+    chat_id: Optional[UUID] = None
+    payload: dict[str, Any] = field(default_factory=dict)
+
+
+async def emit_changes(session: AsyncSession, *events: ChangeEvent) -> None:
+    """
+    Record change events in the outbox.
+
+    Must be called inside the transaction that makes the change - the
+    events become visible to the relay only if that transaction commits.
+    """
+    if not events:
+        return
+    await session.execute(
+        insert(OutboxEvents),
+        [
+            {
+                "aggregate_type": e.aggregate_type,
+                "aggregate_id": e.aggregate_id,
+                "chat_id": e.chat_id,
+                "event_type": e.event_type,
+                "payload": e.payload,
+            }
+            for e in events
+        ],
+    )
+
+
+class OutboxRelay:
+    """
+    Publishes committed outbox rows to a Redis stream, oldest first.
+
+    Each stream entry carries `version` (the outbox id, monotonically
+    increasing) so consumers can drop stale invalidations. Delivery is
+    at-least-once: rows are deleted only after XADD succeeded. A
+    transaction-level advisory lock keeps a single relay active across
+    workers, which preserves ordering.
+    """
+
+    LOCK_SQL = text("SELECT pg_try_advisory_xact_lock(hashtext('outbox_relay'))")  # noqa: E501
+
+    def __init__(
+        self,
+        stream: str,
+        stream_maxlen: int,
+        batch_size: int,
+        poll_interval_s: float,
+    ):
+        self.stream = stream
+        self.stream_maxlen = stream_maxlen
+        self.batch_size = batch_size
+        self.poll_interval_s = poll_interval_s
+
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+        self.published = 0
+        self.failures = 0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="outbox-relay")
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task:
+            try:
+                await self._task
+            finally:
+                self._task = None
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            relayed = 0
+            try:
+                relayed = await self.relay_once()
+            except RedisUnavailable:
+                self.failures += 1
+            except Exception:
+                self.failures += 1
+                log.exception("Outbox relay failed")
+
+            # Keep draining while there is a backlog
+            if relayed >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(
+                    self._stop.wait(),
+                    timeout=self.poll_interval_s,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def relay_once(self) -> int:
+        async with db_helper.session_factory() as session:
+            locked = (await session.execute(self.LOCK_SQL)).scalar_one()
+            if not locked:
+                return 0
+
+            res = await session.execute(
+                select(OutboxEvents)
+                .order_by(OutboxEvents.c.id)
+                .limit(self.batch_size)
+            )
+            rows = res.mappings().all()
+            if not rows:
+                return 0
+
+            async with redis_helper.guard() as r:
+                async with r.pipeline(transaction=False) as pipe:
+                    for row in rows:
+                        pipe.xadd(
+                            self.stream,
+                            {
+                                "version": row["id"],
+                                "type": row["event_type"],
+                                "aggregate": row["aggregate_type"],
+                                "aggregate_id": str(row["aggregate_id"]),
+                                "chat_id": str(row["chat_id"] or ""),
+                                "created_at": row["created_at"].isoformat(),
+                                "payload": orjson.dumps(row["payload"]),
+                            },
+                            maxlen=self.stream_maxlen,
+                            approximate=True,
+                        )
+                    await pipe.execute()
+
+            await session.execute(
+                delete(OutboxEvents).where(
+                    OutboxEvents.c.id.in_([row["id"] for row in rows])
+                )
+            )
+            await session.commit()
+
+        self.published += len(rows)
+        log.debug(f"Relayed {len(rows)} outbox events to {self.stream}")
+        return len(rows)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "stream": self.stream,
+            "published": self.published,
+            "failures": self.failures,
+        }
+
+
+outbox_relay = OutboxRelay(
+    stream=settings.OUTBOX_STREAM,
+    stream_maxlen=settings.OUTBOX_STREAM_MAXLEN,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval_s=settings.OUTBOX_POLL_INTERVAL_S,
+)
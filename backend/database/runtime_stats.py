@@ -0,0 +1,324 @@
+import asyncio
+import random
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from cache import redis_helper, RedisLease, RedisUnavailable
+from logger import get_logger
+from settings import settings
+
+from .helper import db_helper
+from .models import RuntimeStatistics
+
+
+log = get_logger(__name__)
+
+FIELDS = ("messages_checked", "ai_requests_made", "messages_deleted")
+
+# Producers (any service):
+#   SADD    runtime_stats:names <name>
+#   HINCRBY runtime_stats:{<name>}:<shard> <field> <n>   shard in [0, SHARDS)
+# The {<name>} hash tag keeps one name's shards in one cluster slot.
+NAMES_KEY = "runtime_stats:names"
+
+
+def shard_key(name: str, shard: int) -> str:
+    return f"runtime_stats:{{{name}}}:{shard}"
+
+
+def flushing_key(name: str) -> str:
+    return f"runtime_stats:{{{name}}}:flushing"
+
+
+def batch_key(name: str) -> str:
+    return f"runtime_stats:{{{name}}}:batch"
+
+
+BATCH_FIELD = "__batch"
+READ_ATTEMPTS = 3
+
+# KEYS[1] flushing hash, KEYS[2] last batch id, KEYS[3..] shard hashes.
+# Moves the shard deltas into the flushing hash, stamped with a new batch
+# id, and returns its contents. A flushing hash left over from a failed
+# flush is returned unchanged (same id) so the retry can be recognised;
+# new deltas wait in the shards for the next batch. Ids are the larger of
+# the previous id + 1 and the Redis clock in microseconds, so they keep
+# increasing even if the id key is lost.
+DRAIN_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  for i = 3, #KEYS do
+    local kv = redis.call('HGETALL', KEYS[i])
+    for j = 1, #kv, 2 do
+      redis.call('HINCRBY', KEYS[1], kv[j], kv[j + 1])
+    end
+    redis.call('DEL', KEYS[i])
+  end
+  if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {}
+  end
+end
+if redis.call('HEXISTS', KEYS[1], '__batch') == 0 then
+  local t = redis.call('TIME')
+  local batch = math.max(
+    (tonumber(redis.call('GET', KEYS[2])) or 0) + 1,
+    tonumber(t[1]) * 1000000 + tonumber(t[2])
+  )
+  batch = string.format('%.0f', batch)
+  redis.call('SET', KEYS[2], batch)
+  redis.call('HSET', KEYS[1], '__batch', batch)
+end
+return redis.call('HGETALL', KEYS[1])
+"""
+
+# KEYS[1] flushing hash, ARGV[1] batch id. Clears only that batch, never a
+# newer one drained by a worker that took over an expired lease.
+CLEAR_LUA = """
+if redis.call('HGET', KEYS[1], '__batch') == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _to_counts(raw: dict[str, Any]) -> dict[str, int]:
+    return {f: int(raw.get(f, 0)) for f in FIELDS}
+
+
+class RuntimeCounters:
+    """
+    Write-behind counters for `runtime_statistics`.
+
+    Increments go to one of `shards` Redis hashes per name, so no single key
+    or Postgres row is hot. Every `flush_interval_s` one worker (Redis lease)
+    drains the shards and applies all deltas to Postgres in one upsert.
+
+    Each drained batch carries an increasing id that is stored on the row
+    in the same upsert. A batch whose id the row already has is skipped, so
+    a retry after a failed clear or an expired lease is a no-op, and
+    `read()` can tell an applied-but-not-yet-cleared batch from a pending
+    one.
+    """
+
+    def __init__(self, shards: int, flush_interval_s: float):
+        self.shards = shards
+        self.flush_interval_s = flush_interval_s
+        self.lease = RedisLease(
+            "runtime_stats:flush_lease",
+            ttl_s=max(flush_interval_s * 3, 30.0),
+        )
+
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._scripts: dict[str, Any] = {}
+        self._script_client: Any = None
+
+        self.flushes = 0
+        self.flushed_names = 0
+        self.failures = 0
+
+    def _shard_keys(self, name: str) -> list[str]:
+        return [shard_key(name, i) for i in range(self.shards)]
+
+    async def incr(self, name: str, field: str, amount: int = 1) -> None:
+        """Raises `RedisUnavailable` when Redis is down."""
+        if field not in FIELDS:
+            raise ValueError(f"Unknown runtime statistic: {field}")
+        shard = random.randrange(self.shards)
+        async with redis_helper.guard() as r:
+            async with r.pipeline(transaction=False) as pipe:
+                pipe.sadd(NAMES_KEY, name)
+                pipe.hincrby(shard_key(name, shard), field, amount)
+                await pipe.execute()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="runtime-counters")
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task:
+            try:
+                await self._task
+            finally:
+                self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.flush_once()
+            except RedisUnavailable:
+                self.failures += 1
+            except Exception:
+                self.failures += 1
+                log.exception("Runtime counters flush failed")
+
+            # The final flush above ran after stop was requested
+            if self._stop.is_set():
+                return
+
+            try:
+                await asyncio.wait_for(
+                    self._stop.wait(),
+                    timeout=self.flush_interval_s,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    def _script(self, r, source: str) -> Any:
+        if self._script_client is not r:
+            self._scripts = {}
+            self._script_client = r
+        if source not in self._scripts:
+            self._scripts[source] = r.register_script(source)
+        return self._scripts[source]
+
+    async def _drain(self) -> dict[str, tuple[int, dict[str, int]]]:
+        """{name: (batch id, deltas)} for every name with a pending batch."""
+        batches = {}
+        async with redis_helper.guard() as r:
+            drain = self._script(r, DRAIN_LUA)
+            for name in await r.smembers(NAMES_KEY):
+                kv = await drain(
+                    keys=[
+                        flushing_key(name),
+                        batch_key(name),
+                        *self._shard_keys(name),
+                    ],
+                )
+                raw = dict(zip(kv[::2], kv[1::2]))
+                if raw:
+                    batches[name] = (int(raw[BATCH_FIELD]), _to_counts(raw))
+        return batches
+
+    async def flush_once(self) -> int:
+        if not await self.lease.acquire():
+            return 0
+
+        try:
+            batches = await self._drain()
+
+            if batches:
+                stmt = pg_insert(RuntimeStatistics).values(
+                    [
+                        {"name": n, "last_flush_batch": batch, **d}
+                        for n, (batch, d) in batches.items()
+                    ]
+                )
+                stmt = stmt.on_conflict_do_update(
+                    constraint="runtime_statistics_name_key",
+                    set_={
+                        **{
+                            f: getattr(RuntimeStatistics, f) + stmt.excluded[f]
+                            for f in FIELDS
+                        },
+                        "last_flush_batch": stmt.excluded.last_flush_batch,
+                        "updated_at": func.now(),
+                    },
+                    # already applied by an earlier attempt
+                    where=(
+                        RuntimeStatistics.last_flush_batch
+                        < stmt.excluded.last_flush_batch
+                    ),
+                )
+                async with db_helper.session_factory() as session:
+                    await session.execute(stmt)
+                    await session.commit()
+
+                async with redis_helper.guard() as r:
+                    clear = self._script(r, CLEAR_LUA)
+                    for name, (batch, _d) in batches.items():
+                        await clear(keys=[flushing_key(name)], args=[batch])
+        finally:
+            await self.lease.release()
+
+        self.flushes += 1
+        self.flushed_names += len(batches)
+        if batches:
+            log.debug(f"Flushed runtime counters for {len(batches)} names")
+        return len(batches)
+
+    async def read(self) -> tuple[dict[str, dict[str, int]], bool]:
+        """
+        Persisted values plus deltas still buffered in Redis.
+
+        Returns (values by name, pending_included). When Redis is down only
+        the persisted values are returned.
+
+        Redis is read first (one MULTI snapshot), Postgres second. A flushing
+        batch whose id the row already has is not added again. If a batch
+        newer than the snapshot was applied in between, the snapshot's
+        shards may have been counted twice, so the read is retried.
+        """
+        for _attempt in range(READ_ATTEMPTS):
+            try:
+                async with redis_helper.guard() as r:
+                    names = sorted(await r.smembers(NAMES_KEY))
+                    async with r.pipeline(transaction=True) as pipe:
+                        for name in names:
+                            pipe.get(batch_key(name))
+                            for key in [flushing_key(name), *self._shard_keys(name)]:  # noqa: E501
+                                pipe.hgetall(key)
+                        snapshot = await pipe.execute()
+            except RedisUnavailable:
+                values, _applied = await self._read_persisted()
+                return values, False
+
+            values, applied = await self._read_persisted()
+
+            consistent = True
+            per_name = self.shards + 2
+            for i, name in enumerate(names):
+                last_batch, flushing, *shards = snapshot[i * per_name:(i + 1) * per_name]  # noqa: E501
+                row_batch = applied.get(name, 0)
+                if flushing:
+                    batch = int(flushing.get(BATCH_FIELD, 0))
+                    consistent &= row_batch <= batch
+                    if row_batch < batch:
+                        shards.append(flushing)
+                else:
+                    consistent &= row_batch <= int(last_batch or 0)
+
+                merged = values.setdefault(name, _to_counts({}))
+                for raw in shards:
+                    for f, v in _to_counts(raw).items():
+                        merged[f] += v
+
+            if consistent:
+                break
+        return values, True
+
+    async def _read_persisted(
+        self,
+    ) -> tuple[dict[str, dict[str, int]], dict[str, int]]:
+        """(values by name, last applied batch id by name)."""
+        async with db_helper.session_factory() as session:
+            res = await session.execute(
+                select(
+                    RuntimeStatistics.name,
+                    RuntimeStatistics.last_flush_batch,
+                    *[getattr(RuntimeStatistics, f) for f in FIELDS],
+                )
+            )
+            rows = res.all()
+        return (
+            {row.name: _to_counts(row._mapping) for row in rows},
+            {row.name: row.last_flush_batch for row in rows},
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "shards": self.shards,
+            "flushes": self.flushes,
+            "flushed_names": self.flushed_names,
+            "failures": self.failures,
+        }
+
+
+runtime_counters = RuntimeCounters(
+    shards=settings.RUNTIME_STATS_SHARDS,
+    flush_interval_s=settings.RUNTIME_STATS_FLUSH_INTERVAL_S,
+)
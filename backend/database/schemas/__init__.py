@@ -10,6 +10,10 @@ __all__ = [
     "ChatPromptLinkResponse",
     "ChatCustomPromptLinkResponse",
     "ChatLinksResponse",
+    "ChatPromptLinksReplace",
+    "ChatCustomPromptLinksReplace",
+    "ChatPromptLinksList",
+    "ChatCustomPromptLinksList",
 ]
 
 
@@ -27,4 +31,8 @@ from .chat_prompt_links import (
     ChatPromptLinkResponse,
     ChatCustomPromptLinkResponse,
     ChatLinksResponse,
+    ChatPromptLinksReplace,
+    ChatCustomPromptLinksReplace,
+    ChatPromptLinksList,
+    ChatCustomPromptLinksList,
 )
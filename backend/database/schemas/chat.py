@@ -23,6 +23,21 @@ class ChatSettingsUpdate(BaseModel):
     min_observation_minutes: Optional[int] = Field(default=None, ge=0)
 
 
+class ChatSettingsPatch(ChatSettingsUpdate):
+    id: UUID
+
+
+class ChatSettingsBulkUpdate(BaseModel):
+    # `settings` is applied to every chat in `chat_ids`; `patches` are
+    # per-chat and win over `settings` for the fields they set
+    chat_ids: list[UUID] = Field(default_factory=list, max_length=500)
+    settings: Optional[ChatSettingsUpdate] = None
+    patches: list[ChatSettingsPatch] = Field(
+        default_factory=list,
+        max_length=500,
+    )
+
+
 class ChatSettingsResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -58,3 +73,9 @@ class ChatSettingsResponse(BaseModel):
 
 class ChatsList(BaseModel):
     chats: list[ChatSettingsResponse]
+    next_cursor: Optional[str] = None
+
+
+class ChatsBulkUpdateResponse(BaseModel):
+    chats: list[ChatSettingsResponse]
+    not_found: list[UUID]
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 
 class ChatPromptLinkCreate(BaseModel):
@@ -52,3 +52,33 @@ class ChatCustomPromptLinkResponse(BaseModel):
 class ChatLinksResponse(BaseModel):
     prompts: list[ChatPromptLinkResponse]
     custom_prompts: list[ChatCustomPromptLinkResponse]
+
+
+class ChatPromptLinksReplace(BaseModel):
+    links: list[ChatPromptLinkCreate] = Field(max_length=200)
+
+    @model_validator(mode="after")
+    def unique_prompts(self) -> "ChatPromptLinksReplace":
+        ids = [x.prompt_id for x in self.links]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Duplicate prompt_id in links")
+        return self
+
+
+class ChatCustomPromptLinksReplace(BaseModel):
+    links: list[ChatCustomPromptLinkCreate] = Field(max_length=200)
+
+    @model_validator(mode="after")
+    def unique_prompts(self) -> "ChatCustomPromptLinksReplace":
+        ids = [x.custom_prompt_id for x in self.links]
+        if len(ids) != len(set(ids)):
+            raise ValueError("Duplicate custom_prompt_id in links")
+        return self
+
+
+class ChatPromptLinksList(BaseModel):
+    prompts: list[ChatPromptLinkResponse]
+
+
+class ChatCustomPromptLinksList(BaseModel):
+    custom_prompts: list[ChatCustomPromptLinkResponse]
@@ -0,0 +1,30 @@
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class DashboardCounters(BaseModel):
+    processed_messages: int
+    spam_detected: int
+    messages_deleted: int
+    trusted_members: int
+    untrusted_members: int
+    active_prompt_links: int
+
+
+class DashboardChatSummary(DashboardCounters):
+    chat_id: UUID
+    title: Optional[str] = None
+    type: str
+    platform_chat_id: int
+    is_active: bool
+
+
+class DashboardTotals(DashboardCounters):
+    chats: int
+
+
+class DashboardSummary(BaseModel):
+    totals: DashboardTotals
+    chats: list[DashboardChatSummary]
@@ -11,7 +11,21 @@ class DeletedMessageResponse(BaseModel):
     nickname: Optional[str] = None
     message_text: str
     timestamp: int
+    # Redis stream entry id, usable as a before/after cursor
+    stream_id: Optional[str] = None
 
 
 class DeletedMessagesList(BaseModel):
     items: list[DeletedMessageResponse]
+    # pass as `before` (or as `after` in after-mode) for the next page;
+    # None when the range is exhausted
+    next_cursor: Optional[str] = None
+    # newest stream id in the page - use as `after` on the next poll
+    last_id: Optional[str] = None
+
+
+class DeletedMessagesFeed(BaseModel):
+    # newest first across all of the caller's chats
+    items: list[DeletedMessageResponse]
+    # opaque per-chat position; None once every stream is exhausted
+    next_cursor: Optional[str] = None
@@ -0,0 +1,22 @@
+from typing import Literal, Optional
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from .chat import ChatSettingsResponse
+
+
+class PolicyPrompt(BaseModel):
+    kind: Literal["prompt", "custom_prompt"]
+    link_id: UUID
+    prompt_id: UUID
+    priority: Optional[int] = None
+    threshold: float
+    text: str
+
+
+class ChatPolicyBundle(BaseModel):
+    version: str
+    chat: ChatSettingsResponse
+    # active links only, ordered by priority (NULLs last)
+    prompts: list[PolicyPrompt]
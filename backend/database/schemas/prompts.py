@@ -18,6 +18,7 @@ class PromptResponse(BaseModel):
 
 class PromptsList(BaseModel):
     prompts: list[PromptResponse]
+    next_cursor: Optional[str] = None
 
 
 class CustomPromptResponse(BaseModel):
@@ -34,6 +35,7 @@ class CustomPromptResponse(BaseModel):
 
 class CustomPromptsList(BaseModel):
     prompts: list[CustomPromptResponse]
+    next_cursor: Optional[str] = None
 
 
 class CustomPromptCreate(BaseModel):
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class StatsStep(str, Enum):
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+
+    @property
+    def delta(self) -> timedelta:
+        return {
+            StatsStep.MINUTE: timedelta(minutes=1),
+            StatsStep.HOUR: timedelta(hours=1),
+            StatsStep.DAY: timedelta(days=1),
+        }[self]
+
+
+class ChatStatsPoint(BaseModel):
+    ts: datetime
+    processed_messages: int
+    spam_detected: int
+    messages_deleted: int
+
+
+class ChatCounterTotals(BaseModel):
+    processed_messages: int = 0
+    spam_detected: int = 0
+    messages_deleted: int = 0
+
+
+class ChatStatsSeries(BaseModel):
+    chat_id: UUID
+    # lifetime values from chat_counters
+    totals: ChatCounterTotals
+    step: StatsStep
+    start: datetime
+    end: datetime
+    # only non-empty buckets; rolled-up ranges are reported at their
+    # stored granularity even when a finer step is requested
+    items: list[ChatStatsPoint]
+
+
+class RuntimeStatsEntry(BaseModel):
+    name: str
+    messages_checked: int
+    ai_requests_made: int
+    messages_deleted: int
+
+
+class RuntimeStatsList(BaseModel):
+    items: list[RuntimeStatsEntry]
+    # False when Redis was unavailable and only flushed values are shown
+    pending_included: bool
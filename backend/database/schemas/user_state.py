@@ -1,8 +1,20 @@
 from datetime import datetime
-from typing import Optional
+from enum import Enum
+from typing import Literal, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CountStrategy(str, Enum):
+    EXACT = "exact"  # count(*) over the chat's user states
+    COUNTER = "counter"  # trigger-maintained chat_member_counts row
+    ESTIMATE = "estimate"  # planner row estimate
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
 
 
 class UserStateResponse(BaseModel):
@@ -26,7 +38,46 @@ class UserStatesList(BaseModel):
     limit: int
     offset: int
     total: int
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
 
 
 class UserStateUpdate(BaseModel):
     trusted: Optional[bool] = None
+
+
+class UserStateEnsure(BaseModel):
+    external_user_id: int
+
+
+class UserStateBulkAction(str, Enum):
+    TRUST = "trust"
+    UNTRUST = "untrust"  # also resets valid_messages and joined_at
+
+
+class UserStatesBulkUpdate(BaseModel):
+    action: UserStateBulkAction
+    state_ids: list[UUID] = Field(default_factory=list, max_length=1000)
+    external_user_ids: list[int] = Field(default_factory=list, max_length=1000)
+
+
+class UserStateBulkItem(BaseModel):
+    # exactly one of state_id / external_user_id, echoing the request
+    state_id: Optional[UUID] = None
+    external_user_id: Optional[int] = None
+    status: Literal["updated", "not_found"]
+    state: Optional[UserStateResponse] = None
+
+
+class UserStatesBulkResponse(BaseModel):
+    items: list[UserStateBulkItem]
+    updated: int
+    not_found: int
+
+
+class UserStatesImportResult(BaseModel):
+    inserted: int  # new trusted states
+    updated: int  # existing untrusted states made trusted
+    # already trusted, repeated in the file, or unparseable lines
+    skipped: int
+    invalid: int  # unparseable lines (included in `skipped`)
@@ -0,0 +1,147 @@
+import asyncio
+from datetime import timedelta
+from typing import Any, Optional
+
+from sqlalchemy import delete, func, literal, literal_column, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from logger import get_logger
+from settings import settings
+
+from .helper import db_helper
+from .models import ChatStatsBuckets
+
+
+log = get_logger(__name__)
+
+COUNTERS = ("processed_messages", "spam_detected", "messages_deleted")
+
+
+class StatsRollup:
+    """
+    Compacts chat_stats_buckets: minute buckets older than
+    `minute_retention` become hour buckets, hour buckets older than
+    `hour_retention` become day buckets.
+
+    Each step is a single `WITH moved AS (DELETE ... RETURNING) INSERT ...
+    ON CONFLICT DO UPDATE` statement, so a bucket is never counted twice or
+    lost. Cutoffs are aligned to the target granularity, so only complete
+    target buckets are folded. An advisory lock keeps one worker active.
+    """
+
+    LOCK_SQL = text("SELECT pg_try_advisory_xact_lock(hashtext('stats_rollup'))")  # noqa: E501
+
+    def __init__(
+        self,
+        interval_s: float,
+        minute_retention: timedelta,
+        hour_retention: timedelta,
+    ):
+        self.interval_s = interval_s
+        self.steps = (
+            ("minute", "hour", minute_retention),
+            ("hour", "day", hour_retention),
+        )
+
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+
+        self.rolled_up = 0
+        self.runs = 0
+        self.failures = 0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run(), name="stats-rollup")
+
+    async def aclose(self) -> None:
+        self._stop.set()
+        if self._task:
+            try:
+                await self._task
+            finally:
+                self._task = None
+
+    async def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                await self.rollup_once()
+            except Exception:
+                self.failures += 1
+                log.exception("Stats rollup failed")
+
+            try:
+                await asyncio.wait_for(
+                    self._stop.wait(),
+                    timeout=self.interval_s,
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    def _fold_stmt(source: str, target: str, retention: timedelta):
+        t = ChatStatsBuckets.c
+        # inlined, not bound: the GROUP BY expression must match the
+        # select list textually
+        unit = literal_column(f"'{target}'")
+        cutoff = func.date_trunc(unit, func.now() - retention)
+
+        moved = (
+            delete(ChatStatsBuckets)
+            .where(t.granularity == source, t.bucket_start < cutoff)
+            .returning(t.chat_id, t.bucket_start, *[t[c] for c in COUNTERS])
+            .cte("moved")
+        )
+        bucket = func.date_trunc(unit, moved.c.bucket_start)
+        folded = select(
+            moved.c.chat_id,
+            literal(target),
+            bucket,
+            *[func.sum(moved.c[c]) for c in COUNTERS],
+        ).group_by(moved.c.chat_id, bucket)
+
+        stmt = pg_insert(ChatStatsBuckets).from_select(
+            ["chat_id", "granularity", "bucket_start", *COUNTERS],
+            folded,
+        )
+        return stmt.on_conflict_do_update(
+            constraint="uk_chat_stats_buckets_chat_gran_start",
+            set_={c: t[c] + stmt.excluded[c] for c in COUNTERS},
+        ).returning(ChatStatsBuckets.c.id)
+
+    async def rollup_once(self) -> int:
+        folded = 0
+        async with db_helper.session_factory() as session:
+            locked = (await session.execute(self.LOCK_SQL)).scalar_one()
+            if not locked:
+                return 0
+
+            for source, target, retention in self.steps:
+                res = await session.execute(
+                    self._fold_stmt(source, target, retention)
+                )
+                folded += len(res.all())
+
+            await session.commit()
+
+        self.runs += 1
+        self.rolled_up += folded
+        if folded:
+            log.debug(f"Rolled up {folded} stats buckets")
+        return folded
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "rolled_up": self.rolled_up,
+            "failures": self.failures,
+        }
+
+
+stats_rollup = StatsRollup(
+    interval_s=settings.STATS_ROLLUP_INTERVAL_S,
+    minute_retention=timedelta(hours=settings.STATS_MINUTE_RETENTION_H),
+    hour_retention=timedelta(days=settings.STATS_HOUR_RETENTION_D),
+)
@@ -0,0 +1,143 @@
+import uuid
+from typing import Any, Optional, Type, TypeVar
+from uuid import UUID
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import (
+    BigInteger,
+    ColumnElement,
+    Row,
+    delete,
+    exists,
+    false,
+    func,
+    literal,
+    select,
+    true,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Base, Chats, UserStates
+
+
+S = TypeVar("S", bound=BaseModel)
+
+
+def chat_owned_by(chat_id_column: Any, user_id: UUID) -> ColumnElement[bool]:
+    """Owner predicate for rows that belong to a chat."""
+    return exists().where(
+        Chats.id == chat_id_column,
+        Chats.user_id == user_id,
+    )
+
+
+async def update_returning(
+    session: AsyncSession,
+    model: Type[Base],
+    where: list[ColumnElement[bool]],
+    values: dict[str, Any],
+    schema: Type[S],
+    not_found: str,
+) -> S:
+    """
+    `UPDATE <model> SET ... WHERE <where> RETURNING *` in one round trip.
+
+    `where` must include the ownership predicate. Zero rows -> 404. The
+    returned row is validated straight into `schema`. Does not commit.
+    """
+    table = model.__table__
+    stmt = update(table).where(*where).values(**values).returning(*table.c)
+    row = (await session.execute(stmt)).one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    return schema.model_validate(row)
+
+
+async def delete_returning(
+    session: AsyncSession,
+    model: Type[Base],
+    where: list[ColumnElement[bool]],
+    not_found: str,
+) -> UUID:
+    """`DELETE FROM <model> WHERE <where> RETURNING id`; 0 rows -> 404."""
+    table = model.__table__
+    stmt = delete(table).where(*where).returning(table.c.id)
+    deleted_id = (await session.execute(stmt)).scalar_one_or_none()
+    if deleted_id is None:
+        raise HTTPException(status_code=404, detail=not_found)
+    return deleted_id
+
+
+async def upsert_user_state(
+    session: AsyncSession,
+    chat_id: UUID,
+    external_user_id: int,
+    owner_id: Optional[UUID] = None,
+) -> Optional[Row]:
+    """
+    Fetch-or-create a user state, normally in one statement:
+    `WITH ins AS (INSERT ... SELECT FROM chats ... ON CONFLICT DO NOTHING
+    RETURNING ...) SELECT FROM ins UNION ALL SELECT existing row`.
+
+    The row comes from the chats SELECT, so `owner_id` (when given) scopes
+    the insert and None is returned for a missing/foreign chat. An existing
+    state is returned untouched - a fetch never writes, so is_active and
+    updated_at keep their values. The extra `created` column is True when
+    the row was inserted. A second SELECT runs only when the first
+    statement lost an insert race. Does not commit.
+    """
+    table = UserStates.__table__
+    source = select(
+        literal(uuid.uuid4()),
+        Chats.id,
+        literal(external_user_id, BigInteger),
+        false(),
+        literal(0),
+        func.now(),
+        true(),
+    ).where(Chats.id == chat_id)
+    if owner_id is not None:
+        source = source.where(Chats.user_id == owner_id)
+
+    stmt = pg_insert(table).from_select(
+        [
+            "id",
+            "chat_id",
+            "external_user_id",
+            "trusted",
+            "valid_messages",
+            "joined_at",
+            "is_active",
+        ],
+        source,
+    )
+    ins = (
+        stmt.on_conflict_do_nothing(
+            constraint="uk_user_states_chat_external_user",
+        )
+        .returning(*table.c, true().label("created"))
+        .cte("ins")
+    )
+
+    existing = select(*table.c, false().label("created")).where(
+        table.c.chat_id == chat_id,
+        table.c.external_user_id == external_user_id,
+    )
+    if owner_id is not None:
+        existing = existing.where(chat_owned_by(table.c.chat_id, owner_id))
+
+    row = (
+        await session.execute(
+            union_all(select(ins), existing.where(~exists(select(ins.c.id))))
+        )
+    ).one_or_none()
+    if row is None:
+        # A concurrent insert committed after our snapshot: DO NOTHING
+        # skipped the row and the SELECT could not see it. A new statement
+        # takes a new snapshot (READ COMMITTED); still None means no chat.
+        row = (await session.execute(existing)).one_or_none()
+    return row
@@ -6,7 +6,12 @@ from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
+from cache import redis_helper, user_cache
 from database import db_helper
+from database.auto_trust import auto_trust_sweeper
+from database.outbox import outbox_relay
+from database.runtime_stats import runtime_counters
+from database.stats_rollup import stats_rollup
 from logger import (
     setup_logging,
     start_log_shipping,
@@ -14,6 +19,7 @@ from logger import (
     get_logger,
 )
 from api import router
+from api.hashing import password_hasher
 
 
 log = get_logger(__name__)
@@ -26,10 +32,25 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     log.info("Starting up the FastAPI application...")
 
+    await redis_helper.start()
+    await user_cache.start()
+    password_hasher.start()
+    await outbox_relay.start()
+    await stats_rollup.start()
+    await runtime_counters.start()
+    await auto_trust_sweeper.start()
+
     yield
 
     log.info("Shutting down the FastAPI application...")
 
+    await auto_trust_sweeper.aclose()
+    await runtime_counters.aclose()
+    await stats_rollup.aclose()
+    await outbox_relay.aclose()
+    await password_hasher.shutdown()
+    await user_cache.aclose()
+    await redis_helper.dispose()
     await db_helper.dispose()
     await stop_log_shipping()
 
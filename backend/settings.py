@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,6 +23,61 @@ class Settings(BaseSettings):
     JWT_SECRET: str = "change-me"
     JWT_ALG: str = "HS256"
     JWT_ACCESS_TTL_MIN: int = 60 * 24 * 7  # 7 days
+    JWT_CACHE_SIZE: int = 10_000
+
+    # Produced by `python -m api.argon2_calibration`; None = passlib default
+    ARGON2_TIME_COST: Optional[int] = None
+    ARGON2_MEMORY_COST: Optional[int] = None  # KiB
+    ARGON2_PARALLELISM: Optional[int] = None
+    ARGON2_TARGET_MS: float = 50.0
+
+    HASHING_WORKERS: int = 2
+    HASHING_MAX_QUEUE: int = 32
+
+    LOGIN_MAX_CONCURRENCY: int = 4
+    LOGIN_MAX_WAITING: int = 16
+    LOGIN_WAIT_TIMEOUT_S: float = 2.0
+    LOGIN_IP_RATE_PER_MIN: float = 30.0
+    LOGIN_IP_BURST: int = 10
+    LOGIN_EMAIL_RATE_PER_MIN: float = 10.0
+    LOGIN_EMAIL_BURST: int = 5
+
+    REDIS_URL: str = "redis://redis:6379"
+    REDIS_POOL_SIZE: int = 50
+    REDIS_POOL_TIMEOUT_S: float = 1.0
+    REDIS_SOCKET_TIMEOUT_S: float = 0.5
+    REDIS_SOCKET_CONNECT_TIMEOUT_S: float = 0.5
+    REDIS_BREAKER_FAILURE_THRESHOLD: int = 5
+    REDIS_BREAKER_RESET_S: float = 5.0
+
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_LOCAL_TTL_S: float = 30.0
+    USER_CACHE_REDIS_TTL_S: int = 120
+
+    POLICY_CACHE_SIZE: int = 10_000
+    POLICY_CACHE_TTL_S: float = 5.0
+
+    DASHBOARD_CACHE_SIZE: int = 10_000
+    DASHBOARD_CACHE_TTL_S: float = 15.0
+
+    OUTBOX_STREAM: str = "changes"
+    OUTBOX_STREAM_MAXLEN: int = 100_000
+    OUTBOX_BATCH_SIZE: int = 500
+    OUTBOX_POLL_INTERVAL_S: float = 0.5
+
+    STATS_ROLLUP_INTERVAL_S: float = 60.0
+    STATS_MINUTE_RETENTION_H: int = 24
+    STATS_HOUR_RETENTION_D: int = 31
+    STATS_MAX_POINTS: int = 1440
+
+    RUNTIME_STATS_SHARDS: int = 16
+    RUNTIME_STATS_FLUSH_INTERVAL_S: float = 10.0
+
+    AUTO_TRUST_INTERVAL_S: float = 60.0
+    AUTO_TRUST_BATCH_SIZE: int = 1000
+    AUTO_TRUST_MAX_BATCHES: int = 50
+
+    USER_STATES_IMPORT_MAX_ROWS: int = 1_000_000
 
     OS_INGEST_URL: str = "http://localhost:8080/ingest"
 
@@ -69,4 +69,20 @@ impl RedisService {
 
         Ok(job_id)
     }
+
+    /// Drop the backend's cached copy of a user and tell every backend
+    /// worker to evict its in-process entry (see backend/cache/user_cache.py)
+    pub async fn invalidate_user_cache(&self, user_id: Uuid) -> RedisResult<()> {
+        let mut conn = self.client.get_multiplexed_async_connection().await?;
+
+        let _: () = redis::pipe()
+            .del(format!("user_cache:{}", user_id))
+            .ignore()
+            .publish("user_cache:invalidate", user_id.to_string())
+            .ignore()
+            .query_async(&mut conn)
+            .await?;
+
+        Ok(())
+    }
 }
@@ -1,5 +1,7 @@
+use crate::redis_service::RedisService;
 use chrono::Utc;
 use entity::{chats, user_states, users};
+use sea_orm::sea_query::OnConflict;
 use sea_orm::{ActiveModelTrait, ColumnTrait, DatabaseConnection, EntityTrait, QueryFilter, Set};
 use uuid::Uuid;
 use teloxide::{Bot, prelude::Requester};
@@ -72,9 +74,6 @@ pub async fn add_chat(
         cleanup_links: Set(false),
         allowed_link_domains: Set(None),
         user_id: Set(user.id),
-        messages_deleted: Set(0),
-        processed_messages: Set(0),
-        spam_detected: Set(0),
         allowed_mentions: Set(None),
         cleanup_emails: Set(false),
 
@@ -98,28 +97,31 @@ pub async fn ensure_user_state(
         .await?
         .ok_or_else(|| sea_orm::DbErr::Custom("Chat not found".to_string()))?;
 
-    // Check if user state already exists
-    let existing_state = user_states::Entity::find()
-        .filter(user_states::Column::ExternalUserId.eq(telegram_user_id))
-        .filter(user_states::Column::ChatId.eq(chat.id))
-        .one(db)
-        .await?;
+    // Insert-or-ignore on the unique (chat_id, external_user_id): no
+    // select-then-insert race between concurrent messages of a new member
+    let user_state = user_states::ActiveModel {
+        id: Set(Uuid::new_v4()),
+        created_at: Set(Utc::now().into()),
+        updated_at: Set(Utc::now().into()),
+        is_active: Set(true),
+        external_user_id: Set(telegram_user_id),
+        trusted: Set(false),
+        joined_at: Set(Some(Utc::now().into())),
+        valid_messages: Set(0),
+        chat_id: Set(chat.id),
+    };
 
-    if existing_state.is_none() {
-        let user_state = user_states::ActiveModel {
-            id: Set(Uuid::new_v4()),
-            created_at: Set(Utc::now().into()),
-            updated_at: Set(Utc::now().into()),
-            is_active: Set(true),
-            external_user_id: Set(telegram_user_id),
-            trusted: Set(false),
-            joined_at: Set(Some(Utc::now().into())),
-            valid_messages: Set(0),
-            chat_id: Set(chat.id),
-        };
-
-        user_state.insert(db).await?;
-    }
+    user_states::Entity::insert(user_state)
+        .on_conflict(
+            OnConflict::columns([
+                user_states::Column::ChatId,
+                user_states::Column::ExternalUserId,
+            ])
+            .do_nothing()
+            .to_owned(),
+        )
+        .exec_without_returning(db)
+        .await?;
 
     Ok(())
 }
@@ -202,6 +204,20 @@ pub async fn update_chat_link_if_empty(
     Ok(())
 }
 
+async fn invalidate_user_cache(user_id: Uuid) {
+    // The backend caches authenticated users for up to a few minutes;
+    // a failed invalidation only delays the linkage becoming visible
+    let redis_url =
+        std::env::var("REDIS_URL").unwrap_or_else(|_| "redis://localhost:6379".to_string());
+    let result = match RedisService::new(&redis_url) {
+        Ok(redis_service) => redis_service.invalidate_user_cache(user_id).await,
+        Err(e) => Err(e),
+    };
+    if let Err(e) = result {
+        tracing::warn!("Failed to invalidate user cache for {}: {}", user_id, e);
+    }
+}
+
 pub async fn connect_telegram_to_account(
     db: &DatabaseConnection,
     user_uuid: Uuid,
@@ -231,6 +247,7 @@ pub async fn connect_telegram_to_account(
         user.telegram_user_id = Set(Some(telegram_user_id));
         user.updated_at = Set(Utc::now().into());
         user.update(db).await?;
+        invalidate_user_cache(user_uuid).await;
         Ok(ConnectionResult::Success)
     } else {
         Ok(ConnectionResult::UserNotFound)
@@ -1,3 +1,4 @@
+use sea_orm::sea_query::Expr;
 use sea_orm::{ActiveModelTrait, ColumnTrait, DatabaseConnection, EntityTrait, QueryFilter, Set};
 use std::sync::Arc;
 use teloxide::prelude::*;
@@ -7,7 +8,7 @@ use crate::bot::handlers::GroupWorkItem;
 use crate::bot::helpers::delete_message_by_ids;
 use crate::bot::utils::extract_message_with_links;
 use crate::redis_service::RedisService;
-use entity::{chats, user_states};
+use entity::{chat_counters, chats, user_states};
 use uuid;
 
 async fn get_chat_uuid_by_platform_id(
@@ -337,9 +338,16 @@ async fn update_message_counts(
 
     if let Some(chat) = chat {
         let chat_id_uuid = chat.id;
-        let mut chat_active: chats::ActiveModel = chat.into();
-        chat_active.processed_messages = Set(chat_active.processed_messages.unwrap() + 1);
-        chat_active.update(db).await?;
+
+        // Atomic increment on the narrow counters row; leaves `chats` untouched
+        chat_counters::Entity::update_many()
+            .col_expr(
+                chat_counters::Column::ProcessedMessages,
+                Expr::col(chat_counters::Column::ProcessedMessages).add(1),
+            )
+            .filter(chat_counters::Column::ChatId.eq(chat_id_uuid))
+            .exec(db)
+            .await?;
 
         // Update user valid messages if AI checks are disabled or user is trusted/owner
         if !chat_data.enable_ai_check || is_trusted_or_owner {
@@ -0,0 +1,76 @@
+//! `SeaORM` Entity, @generated by sea-orm-codegen 1.1.19
+
+use sea_orm::entity::prelude::*;
+
+#[derive(Copy, Clone, Default, Debug, DeriveEntity)]
+pub struct Entity;
+
+impl EntityName for Entity {
+    fn table_name(&self) -> &str {
+        "chat_counters"
+    }
+}
+
+#[derive(Clone, Debug, PartialEq, DeriveModel, DeriveActiveModel, Eq)]
+pub struct Model {
+    pub chat_id: Uuid,
+    pub processed_messages: i64,
+    pub spam_detected: i64,
+    pub messages_deleted: i64,
+}
+
+#[derive(Copy, Clone, Debug, EnumIter, DeriveColumn)]
+pub enum Column {
+    ChatId,
+    ProcessedMessages,
+    SpamDetected,
+    MessagesDeleted,
+}
+
+#[derive(Copy, Clone, Debug, EnumIter, DerivePrimaryKey)]
+pub enum PrimaryKey {
+    ChatId,
+}
+
+impl PrimaryKeyTrait for PrimaryKey {
+    type ValueType = Uuid;
+    fn auto_increment() -> bool {
+        false
+    }
+}
+
+#[derive(Copy, Clone, Debug, EnumIter)]
+pub enum Relation {
+    Chats,
+}
+
+impl ColumnTrait for Column {
+    type EntityName = Entity;
+    fn def(&self) -> ColumnDef {
+        match self {
+            Self::ChatId => ColumnType::Uuid.def(),
+            Self::ProcessedMessages => ColumnType::BigInteger.def(),
+            Self::SpamDetected => ColumnType::BigInteger.def(),
+            Self::MessagesDeleted => ColumnType::BigInteger.def(),
+        }
+    }
+}
+
+impl RelationTrait for Relation {
+    fn def(&self) -> RelationDef {
+        match self {
+            Self::Chats => Entity::belongs_to(super::chats::Entity)
+                .from(Column::ChatId)
+                .to(super::chats::Column::Id)
+                .into(),
+        }
+    }
+}
+
+impl Related<super::chats::Entity> for Entity {
+    fn to() -> RelationDef {
+        Relation::Chats.def()
+    }
+}
+
+impl ActiveModelBehavior for ActiveModel {}
@@ -29,9 +29,6 @@ pub struct Model {
     pub cleanup_links: bool,
     pub allowed_link_domains: Option<Json>,
     pub user_id: Uuid,
-    pub messages_deleted: i32,
-    pub processed_messages: i32,
-    pub spam_detected: i32,
     pub allowed_mentions: Option<Json>,
     pub cleanup_emails: bool,
     pub max_emoji_count: i32,
@@ -55,9 +52,6 @@ pub enum Column {
     CleanupLinks,
     AllowedLinkDomains,
     UserId,
-    MessagesDeleted,
-    ProcessedMessages,
-    SpamDetected,
     AllowedMentions,
     CleanupEmails,
     MaxEmojiCount,
@@ -77,6 +71,7 @@ impl PrimaryKeyTrait for PrimaryKey {
 
 #[derive(Copy, Clone, Debug, EnumIter)]
 pub enum Relation {
+    ChatCounters,
     ChatCustomPrompts,
     ChatPrompts,
     UserStates,
@@ -103,9 +98,6 @@ impl ColumnTrait for Column {
             Self::CleanupLinks => ColumnType::Boolean.def(),
             Self::AllowedLinkDomains => ColumnType::JsonBinary.def().null(),
             Self::UserId => ColumnType::Uuid.def(),
-            Self::MessagesDeleted => ColumnType::Integer.def(),
-            Self::ProcessedMessages => ColumnType::Integer.def(),
-            Self::SpamDetected => ColumnType::Integer.def(),
             Self::AllowedMentions => ColumnType::JsonBinary.def().null(),
             Self::CleanupEmails => ColumnType::Boolean.def(),
             Self::MaxEmojiCount => ColumnType::Integer.def(),
@@ -116,6 +108,7 @@ impl ColumnTrait for Column {
 impl RelationTrait for Relation {
     fn def(&self) -> RelationDef {
         match self {
+            Self::ChatCounters => Entity::has_one(super::chat_counters::Entity).into(),
             Self::ChatCustomPrompts => Entity::has_many(super::chat_custom_prompts::Entity).into(),
             Self::ChatPrompts => Entity::has_many(super::chat_prompts::Entity).into(),
             Self::UserStates => Entity::has_many(super::user_states::Entity).into(),
@@ -127,6 +120,12 @@ impl RelationTrait for Relation {
     }
 }
 
+impl Related<super::chat_counters::Entity> for Entity {
+    fn to() -> RelationDef {
+        Relation::ChatCounters.def()
+    }
+}
+
 impl Related<super::chat_custom_prompts::Entity> for Entity {
     fn to() -> RelationDef {
         Relation::ChatCustomPrompts.def()
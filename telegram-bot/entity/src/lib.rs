@@ -2,6 +2,7 @@
 
 pub mod prelude;
 
+pub mod chat_counters;
 pub mod chat_custom_prompts;
 pub mod chat_prompts;
 pub mod chats;
@@ -1,5 +1,6 @@
 //! `SeaORM` Entity, @generated by sea-orm-codegen 1.1.19
 
+pub use super::chat_counters::Entity as ChatCounters;
 pub use super::chat_custom_prompts::Entity as ChatCustomPrompts;
 pub use super::chat_prompts::Entity as ChatPrompts;
 pub use super::chats::Entity as Chats;